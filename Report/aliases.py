@@ -0,0 +1,57 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Process alias table (media/map/alias.csv: Alias,Process). Source processes
+# listed under Alias are reported as the Process they map to, e.g. the
+# Go_Noise_IB / Go_Noise_OB dialer folders both count as GO_NOISE.
+# Adding a merge is one more line in the file, not another column scan.
+
+
+def load_aliases(alias_file):
+    """Reads alias.csv into {alias: process}, following chains (A→B, B→C ⇒ A→C)."""
+    if not os.path.exists(alias_file):
+        return {}
+
+    alias_df = pd.read_csv(alias_file, dtype=str).dropna()
+    raw = dict(zip(alias_df["Alias"].str.strip(), alias_df["Process"].str.strip()))
+
+    aliases = {}
+    for alias, target in raw.items():
+        seen = {alias}
+        while target in raw and raw[target] != target and target not in seen:
+            seen.add(target)
+            target = raw[target]
+        aliases[alias] = target
+    return aliases
+
+
+def apply_aliases(process, aliases):
+    """Renames every aliased process in one pass over the categorical codes."""
+    if not aliases:
+        return process
+
+    if isinstance(process.dtype, pd.CategoricalDtype):
+        # Interned column: remap codes so aliases point at their target's code
+        categories = process.cat.categories
+        renamed = pd.Index([aliases.get(p, p) for p in categories], dtype=object)
+        categories = categories.append(renamed.difference(categories, sort=False))
+        remap = np.append(categories.get_indexer(renamed), -1)
+        codes = remap[process.cat.codes.to_numpy()]
+        return pd.Series(
+            pd.Categorical.from_codes(codes, categories=categories),
+            index=process.index, name=process.name
+        )
+
+    codes, uniques = pd.factorize(process, use_na_sentinel=True)
+    renamed = np.array([aliases.get(p, p) for p in uniques], dtype=object)
+
+    # -1 codes (missing Process) pick the appended NaN
+    lookup = np.append(renamed, np.nan)
+    return pd.Series(lookup[codes], index=process.index, name=process.name)
+
+
+def source_processes(billed_processes, aliases):
+    """Source folders to scan: the billed processes plus every alias feeding one of them."""
+    billed = set(billed_processes)
+    return sorted(billed | {alias for alias, target in aliases.items() if target in billed})
@@ -0,0 +1,110 @@
+import os
+import sys
+from datetime import datetime
+from calendar import monthrange
+
+import pandas as pd
+
+from frames import frame_exists
+from parallel import map_ordered, DEFAULT_WORKERS
+from revenue_engine import load_rules, load_reference, index_reference, prepare_logins, build_revenue
+import revenue
+
+# Restates the revenue reports of a range of months, e.g. after a fix to
+# cost.csv or meta.csv:
+#
+#     python backfill.py 2025-08 2025-12          # PRESET below
+#     python backfill.py 2025-08 2025-12 z2
+#
+# map.csv, meta.csv, cost.csv and rules.csv are read and indexed once for the
+# whole range; each month is then computed in a worker process from its
+# final_login/logins_<mon><yyyy> file. Every month gets its usual
+# report/revenue_<mon><yyyy>.csv, and all of them are also written together
+# (with a Month column) to one history file.
+
+# ===== CONFIG =====
+PRESET = revenue.PRESET
+START_MONTH = "2025-08"       # yyyy-mm, inclusive
+END_MONTH = "2025-12"
+
+# Parallel months: WORKERS = 1 runs serially in this process
+WORKERS = DEFAULT_WORKERS
+
+HISTORY_FILE = r"D:\Revenue\media\report\revenue_history_{start}_{end}.csv"
+
+
+def month_range(start, end):
+    """[(year, month), …] from start to end (yyyy-mm strings), inclusive."""
+    first = datetime.strptime(start, "%Y-%m")
+    last = datetime.strptime(end, "%Y-%m")
+    if last < first:
+        raise ValueError(f"❌ Backfill range ends before it starts: {start} → {end}")
+
+    months = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def revenue_month(year, month, preset, map_df, rules, indexes):
+    """Report rows of one month (worker task); None when the month has no login file."""
+    login_file, _, fail_path = revenue.month_files(year, month)
+    if not frame_exists(login_file):
+        return None
+
+    month_label = datetime(year, month, 1).strftime("%b")
+    _, days_in_month = monthrange(year, month)
+
+    login_df = prepare_logins(revenue.load_logins(login_file), year, month, month_label, fail_path)
+    return build_revenue(login_df, map_df, None, None, rules, preset, month_label, days_in_month, indexes=indexes)
+
+
+def main(start=START_MONTH, end=END_MONTH, preset=PRESET, workers=WORKERS):
+    """Writes the reports of every month in the range and the combined history; returns the history."""
+    months = month_range(start, end)
+    print(f"📅 Backfill {start} → {end} ({len(months)} months), preset {preset}\n")
+
+    # --- Reference data: read and indexed once for every month ---
+    rules = load_rules(revenue.rules_path, preset)
+    map_df, meta_df, cost_df = load_reference(revenue.map_path, revenue.meta_path, revenue.cost_path, preset)
+    indexes = index_reference(meta_df, cost_df)
+
+    tasks = [(year, month, preset, map_df, rules, indexes) for year, month in months]
+    history = []
+
+    for (year, month, *_), df_out, error in map_ordered(revenue_month, tasks, workers):
+        label = datetime(year, month, 1).strftime("%b-%Y")
+
+        if error is not None:
+            print(f"❌ Error processing {label}: {error}")
+            continue
+        if df_out is None:
+            print(f"⚠️ No login file for {label}, skipped")
+            continue
+
+        revenue.save_revenue(df_out, revenue.month_files(year, month)[1])
+        history.append(df_out.assign(Month=label))
+
+    if not history:
+        print("⚠️ No month produced a report; no history written")
+        return None
+
+    history_df = pd.concat(history, ignore_index=True)
+    history_df = history_df[["Month"] + [c for c in history_df.columns if c != "Month"]]
+
+    history_path = HISTORY_FILE.format(start=start, end=end)
+    os.makedirs(os.path.dirname(history_path), exist_ok=True)
+    history_df.to_csv(history_path, index=False)
+    print(f"\n✅ Revenue history ({len(history)} months) saved at:\n{history_path}")
+    return history_df
+
+
+# Guard required: the worker processes (spawn on Windows) re-import this module
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) not in (2, 3):
+        print("Usage: python backfill.py <start yyyy-mm> <end yyyy-mm> [preset]")
+        sys.exit(1)
+    main(*args)
@@ -2,221 +2,382 @@ import os
 import pandas as pd
 from datetime import datetime
 
+from manifest import (
+    load_manifest, save_manifest, is_unchanged, record_file,
+    part_path_for, write_part, read_part, forget_missing, drop_parts, entry_parts
+)
+from frames import write_frame, read_frame, frame_exists
+from dedup import DEDUP_KEY, drop_duplicate_rows, load_seen, save_seen
+from dates import format_dates
+from aliases import load_aliases, source_processes
+from xlsx_cache import evict_deleted
+from date_index import load_index, save_index, lookup_range, record_range, prune_index
+from parallel import map_ordered, DEFAULT_WORKERS
+from schemas import DIALER_SCHEMA, DOWNTIME_SCHEMA, DICTIONARY_DIR, concat_categoricals, intern_keys
+from readers import read_dialer_file, split_downtime_file, read_processed_file
+
 # ===== CONFIG =====
 MAP_FILE = r"D:\Revenue\media\map\map.csv"
+ALIAS_FILE = r"D:\Revenue\media\map\alias.csv"
 SOURCE_BASE = r"C:\Users\ICCSADMIN\Documents\GitHub\Dialer\media"
 DEST_DIR = r"D:\Revenue\media\combined"
 DOWNTIME_SOURCE = r"D:\Revenue\media\Downtime"
 DOWNTIME_DEST = r"D:\Revenue\media\downtime_combined"
 PROCESSED_BASE = r"D:\auto\media\processed"
 PROCESSED_DEST = r"D:\Revenue\media\processed_combined"
+STATE_DIR = r"D:\Revenue\media\state"
+EXPORT_CSV = True   # also write human-readable CSVs next to the binary intermediates
 
-# ===== GET PREVIOUS MONTH RANGE =====
-# today = datetime.today()
-# first_day_this_month = today.replace(day=1)
-# last_month_date = first_day_this_month - pd.Timedelta(days=1)
+# Parallel parsing: WORKERS = 1 runs serially in this process
+WORKERS = DEFAULT_WORKERS
+MAX_IN_FLIGHT = WORKERS * 2   # parsed files allowed in flight at once
 
-# month_str = last_month_date.strftime("%m")
-# month_name_short = last_month_date.strftime("%b").lower()
-# year_str = last_month_date.strftime("%Y")
 
-# start_prev_month = last_month_date.replace(day=1)
-# end_prev_month = last_month_date
+def get_month_range():
+    # ===== GET PREVIOUS MONTH RANGE =====
+    # today = datetime.today()
+    # first_day_this_month = today.replace(day=1)
+    # last_month_date = first_day_this_month - pd.Timedelta(days=1)
 
-# ===== GET YESTERDAY'S MONTH RANGE =====
-today = datetime.today()
-yesterday = today - pd.Timedelta(days=0)
+    # month_str = last_month_date.strftime("%m")
+    # month_name_short = last_month_date.strftime("%b").lower()
+    # year_str = last_month_date.strftime("%Y")
 
-month_str = yesterday.strftime("%m")        # Month number (01–12)
-month_name_short = yesterday.strftime("%b").lower()  # Short month (jan, feb, mar..)
-year_str = yesterday.strftime("%Y")         # Year (2024)
+    # start_prev_month = last_month_date.replace(day=1)
+    # end_prev_month = last_month_date
 
-# Range of entire month of yesterday
-start_prev_month = yesterday.replace(day=1)
-end_prev_month = yesterday.replace(day=yesterday.day)
+    # ===== GET YESTERDAY'S MONTH RANGE =====
+    today = datetime.today()
+    yesterday = today - pd.Timedelta(days=0)
 
+    month_str = yesterday.strftime("%m")        # Month number (01–12)
+    month_name_short = yesterday.strftime("%b").lower()  # Short month (jan, feb, mar..)
+    year_str = yesterday.strftime("%Y")         # Year (2024)
 
-print(f"\n📌 Processing data for: {month_name_short.upper()}-{year_str} ({start_prev_month} → {end_prev_month})\n")
+    # Range of entire month of yesterday
+    start_prev_month = yesterday.replace(day=1)
+    end_prev_month = yesterday.replace(day=yesterday.day)
 
-# ===== READ PROCESSES =====
-# df_map = pd.read_csv(MAP_FILE)
-# processes = df_map["Process"].dropna().unique()
+    return month_str, month_name_short, year_str, start_prev_month, end_prev_month
 
-# ===== READ PROCESSES =====
-df_map = pd.read_csv(MAP_FILE)
 
-map_processes = df_map["Process"].dropna().unique().tolist()
+def read_processes():
+    # ===== READ PROCESSES =====
+    # df_map = pd.read_csv(MAP_FILE)
+    # processes = df_map["Process"].dropna().unique()
 
-# Extra processes not present in map.csv
-extra_processes = [
-    "ZET_Inbound",
-    "ZET_Inbound_Partner",
-    "ZET_Outbound",
-    "Go_Noise_IB",
-    "Go_Noise_OB"
-]
+    # ===== READ PROCESSES =====
+    df_map = pd.read_csv(MAP_FILE)
 
-# Merge + remove duplicates
-processes = sorted(set(map_processes + extra_processes))
+    map_processes = df_map["Process"].dropna().unique().tolist()
 
-print(f"📌 Total processes considered: {len(processes)}")
+    # Source folders not present in map.csv (e.g. ZET_Inbound → ZET) come
+    # from alias.csv: every alias of a billed process is scanned too
+    return source_processes(map_processes, load_aliases(ALIAS_FILE))
 
-# Function to extract latest date from processed file
-def extract_date_from_processed(df, file_path):
-    """Extracts latest valid date from the 'Date' column (flexible format)."""
-    if "Date" not in df.columns:
-        print(f"⚠️ Missing 'Date' column → Skipping {file_path}")
-        return None
 
-    try:
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce", dayfirst=True)
-    except:
-        print(f"❌ Could not convert Date format in: {file_path}")
-        return None
+# ==============================================================
+# ========== STEP 1: COMBINE DIALER FILES =======================
+# ==============================================================
 
-    valid_dates = df["Date"].dropna()
+def combine_dialer(processes, month_str, month_name_short, year_str, write=True):
+    """Combines the month's dialer files; returns the combined frame (None if no files).
+
+    write=False keeps the result in memory only (see pipeline.py).
+    """
+    print("\n===== Step 1: Processing Dialer Data =====\n")
+
+    # Month store: one parsed part per dialer file + a manifest of what was ingested
+    dialer_store_dir = os.path.join(STATE_DIR, f"dialer_{month_name_short}{year_str}")
+    dialer_manifest_path = os.path.join(dialer_store_dir, "manifest.json")
+    dialer_manifest = load_manifest(dialer_manifest_path)
+
+    seen_path = os.path.join(dialer_store_dir, "fingerprints.npy")
+
+    # Parts parsed with another schema version are re-parsed. A missing or
+    # unreadable manifest has no schema either: then nothing is known about
+    # what last run's output holds, so the month is rebuilt, not appended to
+    manifest_reset = dialer_manifest.get("schema") != DIALER_SCHEMA["version"]
+    if manifest_reset:
+        dialer_manifest = {"files": {}, "schema": DIALER_SCHEMA["version"]}
+        if os.path.exists(seen_path):
+            os.remove(seen_path)
+
+    # Slots keep listing order: (file_path, stored part or None). Unchanged
+    # files are only loaded from the store if the month has to be rebuilt;
+    # new/changed files are parsed by the worker pool
+    slots = []
+    tasks = []
+    seen_files = set()
+    changed_files = set()
+
+    for process in processes:
+        process_dir = os.path.join(SOURCE_BASE, process, "dialer_data")
+
+        if not os.path.exists(process_dir):
+            print(f"⚠️ Dialer folder not found for {process} → Skipping")
+            continue
 
-    if valid_dates.empty:
-        print(f"⚠️ No valid dates found in {file_path}")
-        return None
+        for file in os.listdir(process_dir):
+            if file.endswith("_APR.csv") and file.startswith(f"{year_str}-{month_str}"):
+                file_path = os.path.join(process_dir, file)
+
+                entry = dialer_manifest["files"].get(file_path)
+                if is_unchanged(dialer_manifest, file_path) and os.path.exists(entry["part"]):
+                    slots.append((file_path, entry["part"]))
+                    seen_files.add(file_path)
+                    continue
+
+                if entry is not None:
+                    changed_files.add(file_path)
+                slots.append((file_path, None))
+                tasks.append((file_path, process))
+
+    parsed = {}
+    for (file_path, _), df, error in map_ordered(read_dialer_file, tasks, WORKERS, MAX_IN_FLIGHT):
+        if error is not None:
+            print(f"❌ Error reading {file_path}: {error}")
+            continue
 
-    return valid_dates.max().date()
+        part_path = part_path_for(dialer_store_dir, file_path)
+        write_part(df, part_path)
+        record_file(dialer_manifest, file_path, len(df), part_path)
 
+        seen_files.add(file_path)
+        parsed[file_path] = df
+        print(f"✅ Dialer file added: {file_path}")
 
-# ==============================================================
-# ========== STEP 1: COMBINE DIALER FILES =======================
-# ==============================================================
+    removed_files = forget_missing(dialer_manifest, seen_files)
+    save_manifest(dialer_manifest, dialer_manifest_path)
 
-print("\n===== Step 1: Processing Dialer Data =====\n")
+    print(f"📌 Dialer files: {len(parsed)} parsed, {len(seen_files) - len(parsed)} from store, {len(removed_files)} removed")
 
-combined_data = []
+    output_file = os.path.join(DEST_DIR, f"combine_{month_name_short}{year_str}.csv")
+    seen = load_seen(seen_path)
 
-for process in processes:
-    process_dir = os.path.join(SOURCE_BASE, process, "dialer_data")
+    # Only brand-new files → append their unseen rows to last run's output
+    can_append = (
+        not manifest_reset and seen is not None and frame_exists(output_file)
+        and not removed_files and not (changed_files & set(parsed))
+    )
 
-    if not os.path.exists(process_dir):
-        print(f"⚠️ Dialer folder not found for {process} → Skipping")
-        continue
+    if not seen_files:
+        print("\n⚠️ No Dialer data found for previous month.")
+        return None
+
+    if can_append and not parsed:
+        print(f"\n⏭ Dialer data unchanged since last run: {output_file}")
+        return intern_keys(read_frame(output_file, categoricals=True), DICTIONARY_DIR)
+
+    if can_append:
+        new_rows = concat_categoricals([parsed[f] for f, _ in slots if f in parsed])
+        new_rows, seen = drop_duplicate_rows(new_rows, DEDUP_KEY, seen)
+        combined_df = concat_categoricals([read_frame(output_file, categoricals=True), new_rows])
+    else:
+        combined_data = [parsed.get(f) if part is None else read_part(part) for f, part in slots]
+        combined_df = concat_categoricals(combined_data)
+        combined_df, seen = drop_duplicate_rows(combined_df, DEDUP_KEY)
+
+    intern_keys(combined_df, DICTIONARY_DIR)
+
+    if not write:
+        # The file on disk no longer matches the month; force a rebuild next run
+        if os.path.exists(seen_path):
+            os.remove(seen_path)
+        return combined_df
 
-    for file in os.listdir(process_dir):
-        if file.endswith("_APR.csv") and file.startswith(f"{year_str}-{month_str}"):
-            file_path = os.path.join(process_dir, file)
-            try:
-                df = pd.read_csv(file_path)
-                df["Process"] = process
-                df["Source"] = "Dialer"
-                combined_data.append(df)
-                print(f"✅ Dialer file added: {file_path}")
-            except Exception as e:
-                print(f"❌ Error reading {file_path}: {e}")
-
-if combined_data:
-    combined_df = pd.concat(combined_data, ignore_index=True).drop_duplicates()
     os.makedirs(DEST_DIR, exist_ok=True)
-    output_file = os.path.join(DEST_DIR, f"combine_{month_name_short}{year_str}.csv")
-    combined_df.to_csv(output_file, index=False)
-    print(f"\n🎉 Dialer Combined File Saved: {output_file}")
-else:
-    print("\n⚠️ No Dialer data found for previous month.")
+    write_frame(combined_df, output_file, EXPORT_CSV)
+    save_seen(seen, seen_path)
+    if can_append:
+        print(f"\n🎉 Dialer Combined File Updated (+{len(new_rows)} rows): {output_file}")
+    else:
+        print(f"\n🎉 Dialer Combined File Saved: {output_file}")
+    return combined_df
 
 
 # ==============================================================
 # ========== STEP 2: COMBINE DOWNTIME FILES =====================
 # ==============================================================
 
-print("\n===== Step 2: Processing Downtime Data =====\n")
+def combine_downtime(start_prev_month, end_prev_month, month_name_short, year_str, write=True):
+    """Combines the month's downtime rows; returns the frame (None if there are none)."""
+    print("\n===== Step 2: Processing Downtime Data =====\n")
+
+    downtime_files = [os.path.join(DOWNTIME_SOURCE, f) for f in os.listdir(DOWNTIME_SOURCE) if f.endswith(".csv")]
+    downtime_data = []
+
+    # Month-partitioned store: each raw file is split into per-month parts
+    # once; a run only reads the target month's partition
+    store_dir = os.path.join(STATE_DIR, "downtime")
+    manifest_path = os.path.join(store_dir, "manifest.json")
+    manifest = load_manifest(manifest_path)
+
+    if manifest.get("schema") != DOWNTIME_SCHEMA["version"]:
+        for file in list(manifest["files"]):
+            drop_parts(manifest, file)
+        manifest = {"files": {}, "schema": DOWNTIME_SCHEMA["version"]}
+
+    # A file is re-split when it changed or any of its parts went missing
+    tasks = [
+        (file,) for file in downtime_files
+        if not is_unchanged(manifest, file)
+        or not all(os.path.exists(p) for p in entry_parts(manifest["files"][file]))
+    ]
+
+    for (file,), result, error in map_ordered(split_downtime_file, tasks, WORKERS, MAX_IN_FLIGHT):
+        if error is not None:
+            print(f"❌ Error reading {file}: {error}")
+            continue
+
+        parts, warning = result
+        if warning:
+            print(warning)
+
+        drop_parts(manifest, file)
+        part_paths = []
+        for month_key, part in parts.items():
+            part_path = part_path_for(os.path.join(store_dir, month_key), file)
+            write_part(part, part_path)
+            part_paths.append(part_path)
 
-downtime_files = [os.path.join(DOWNTIME_SOURCE, f) for f in os.listdir(DOWNTIME_SOURCE) if f.endswith(".csv")]
-downtime_data = []
+        record_file(manifest, file, sum(len(p) for p in parts.values()), part_paths)
+        manifest["files"][file]["months"] = sorted(parts)
+        print(f"🗂 Downtime partitioned: {file} → {', '.join(sorted(parts)) or 'no dated rows'}")
 
-for file in downtime_files:
-    try:
-        df = pd.read_csv(file)
+    forget_missing(manifest, set(downtime_files))
+    save_manifest(manifest, manifest_path)
 
-        if "Date" not in df.columns:
-            print(f"⚠️ Missing 'Date' column → Skipping {file}")
+    month_key = start_prev_month.strftime("%Y-%m")
+    month_dir = os.path.join(store_dir, month_key)
+
+    for file in downtime_files:
+        entry = manifest["files"].get(file)
+        if entry is None or month_key not in entry.get("months", []):
             continue
 
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce").dropna()
+        df = read_part(part_path_for(month_dir, file))
         mask = (df["Date"] >= start_prev_month) & (df["Date"] <= end_prev_month)
 
         df_filtered = df.loc[mask].copy()
 
         if not df_filtered.empty:
-            df_filtered["Date"] = df_filtered["Date"].dt.strftime("%m-%d-%Y")
+            df_filtered["Date"] = format_dates(df_filtered["Date"], "%m-%d-%Y")
             df_filtered["Source"] = "Downtime"
             downtime_data.append(df_filtered)
             print(f"🟢 Downtime Added: {file}")
 
-    except Exception as e:
-        print(f"❌ Error reading {file}: {e}")
+    if downtime_data:
+        downtime_combined, _ = drop_duplicate_rows(concat_categoricals(downtime_data), DEDUP_KEY)
+        intern_keys(downtime_combined, DICTIONARY_DIR)
+        if write:
+            os.makedirs(DOWNTIME_DEST, exist_ok=True)
+            downtime_output = os.path.join(DOWNTIME_DEST, f"downtime_{month_name_short}{year_str}.csv")
+            write_frame(downtime_combined, downtime_output, EXPORT_CSV)
+            print(f"\n🎉 Downtime Combined Saved: {downtime_output}")
+        return downtime_combined
 
-if downtime_data:
-    downtime_combined = pd.concat(downtime_data, ignore_index=True).drop_duplicates()
-    os.makedirs(DOWNTIME_DEST, exist_ok=True)
-    downtime_output = os.path.join(DOWNTIME_DEST, f"downtime_{month_name_short}{year_str}.csv")
-    downtime_combined.to_csv(downtime_output, index=False)
-    print(f"\n🎉 Downtime Combined Saved: {downtime_output}")
-else:
     print("\n⚠️ No downtime files found for previous month.")
+    return None
 
 
 # ==============================================================
 # ========== STEP 3: COMBINE PROCESSED FILES ====================
 # ==============================================================
 
-print("\n===== Step 3: Processing PROCESSED Files =====\n")
+def combine_processed(processes, start_prev_month, end_prev_month, month_name_short, year_str, write=True):
+    """Combines the in-range processed files; returns the frame (None if there are none)."""
+    print("\n===== Step 3: Processing PROCESSED Files =====\n")
 
-processed_data = []
+    processed_data = []
+    tasks = []
 
-for process in processes:
-    process_dir = os.path.join(PROCESSED_BASE, process)
+    # Date-range sidecar index: files whose indexed range is fresh are
+    # decided without being opened
+    date_index_path = os.path.join(STATE_DIR, "processed_date_index.json")
+    date_index = load_index(date_index_path)
+    seen_files = set()
 
-    if not os.path.exists(process_dir):
-        print(f"⚠️ Processed folder missing for {process} → Skipping")
-        continue
+    # Parsed copies of unchanged workbooks are reused instead of re-reading Excel
+    xlsx_cache_dir = os.path.join(STATE_DIR, "xlsx_cache")
 
-    print(f"📂 Checking: {process_dir}")
+    for process in processes:
+        process_dir = os.path.join(PROCESSED_BASE, process)
 
-    for file in os.listdir(process_dir):
-        if not file.lower().endswith((".csv", ".xlsx", ".xls")):
+        if not os.path.exists(process_dir):
+            print(f"⚠️ Processed folder missing for {process} → Skipping")
             continue
 
-        file_path = os.path.join(process_dir, file)
+        print(f"📂 Checking: {process_dir}")
 
-        try:
-            df = pd.read_csv(file_path) if file.endswith(".csv") else pd.read_excel(file_path)
+        for file in os.listdir(process_dir):
+            if not file.lower().endswith((".csv", ".xlsx", ".xls")):
+                continue
 
-            # Extract latest date from file
-            extracted_date = extract_date_from_processed(df, file_path)
+            file_path = os.path.join(process_dir, file)
+            seen_files.add(file_path)
+
+            date_range = lookup_range(date_index, file_path)
+            if date_range is not None:
+                extracted_date = date_range[1]
+                if extracted_date is None:
+                    print(f"⚠️ No valid dates (indexed) → Skipping {file_path}")
+                    continue
+                if not (start_prev_month.date() <= extracted_date <= end_prev_month.date()):
+                    print(f"⏭ Skipped (date not in range): {file_path} → {extracted_date}")
+                    continue
+
+            tasks.append((file_path, process, start_prev_month, end_prev_month, xlsx_cache_dir))
+
+    for (file_path, *_), result, error in map_ordered(read_processed_file, tasks, WORKERS, MAX_IN_FLIGHT):
+        if error is not None:
+            print(f"❌ Error reading {file_path}: {error}")
+            continue
 
-            if not extracted_date:
-                continue
+        df, (first_date, extracted_date), warning = result
+        record_range(date_index, file_path, first_date, extracted_date)
+
+        if warning:
+            print(warning)
+        elif df is not None:
+            processed_data.append(df)
+            print(f"📌 Added (based on inside date): {file_path}")
+        else:
+            print(f"⏭ Skipped (date not in range): {file_path} → {extracted_date}")
+
+    prune_index(date_index, seen_files)
+    save_index(date_index, date_index_path)
+    evict_deleted(xlsx_cache_dir, seen_files)
+
+    if processed_data:
+        processed_combined, _ = drop_duplicate_rows(pd.concat(processed_data, ignore_index=True), DEDUP_KEY)
+        intern_keys(processed_combined, DICTIONARY_DIR)
+        if write:
+            os.makedirs(PROCESSED_DEST, exist_ok=True)
+            processed_output = os.path.join(PROCESSED_DEST, f"processed_{month_name_short}{year_str}.csv")
+            write_frame(processed_combined, processed_output, EXPORT_CSV)
+            print(f"\n🎉 Processed Combined Saved: {processed_output}")
+        return processed_combined
 
-            # Check if extracted date falls in previous month
-            if start_prev_month.date() <= extracted_date <= end_prev_month.date():
-                df["Date"] = pd.to_datetime(df["Date"], errors="ignore", dayfirst=True)
-                df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-                df["Date"] = df["Date"].dt.strftime("%m-%d-%Y")
-                
-                df["Process"] = process
-                df["Source"] = "Processed"
-                processed_data.append(df)
-
-                print(f"📌 Added (based on inside date): {file_path}")
-            else:
-                print(f"⏭ Skipped (date not in range): {file_path} → {extracted_date}")
-
-        except Exception as e:
-            print(f"❌ Error reading {file_path}: {e}")
-
-if processed_data:
-    processed_combined = pd.concat(processed_data, ignore_index=True).drop_duplicates()
-    os.makedirs(PROCESSED_DEST, exist_ok=True)
-    processed_output = os.path.join(PROCESSED_DEST, f"processed_{month_name_short}{year_str}.csv")
-    processed_combined.to_csv(processed_output, index=False)
-    print(f"\n🎉 Processed Combined Saved: {processed_output}")
-else:
     print("\n⚠️ No processed files found for previous month.")
+    return None
+
+
+def main():
+    month_str, month_name_short, year_str, start_prev_month, end_prev_month = get_month_range()
+
+    print(f"\n📌 Processing data for: {month_name_short.upper()}-{year_str} ({start_prev_month} → {end_prev_month})\n")
+
+    processes = read_processes()
+    print(f"📌 Total processes considered: {len(processes)}")
+
+    combine_dialer(processes, month_str, month_name_short, year_str)
+    combine_downtime(start_prev_month, end_prev_month, month_name_short, year_str)
+    combine_processed(processes, start_prev_month, end_prev_month, month_name_short, year_str)
+
+    print("\n✔️ Script completed successfully.\n")
+
 
-print("\n✔️ Script completed successfully.\n")
+# Guard required: worker processes (spawn on Windows) re-import this module
+if __name__ == "__main__":
+    main()
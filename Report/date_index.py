@@ -0,0 +1,54 @@
+import os
+from datetime import date
+
+from manifest import load_manifest, save_manifest
+
+# Sidecar index of the date range inside each processed file, keyed by
+# path + size + mtime. Lets combine.py skip out-of-range files without
+# opening them. Same JSON layout as manifest.py ({"files": {...}}).
+# INDEX_VERSION changes whenever date parsing does; older ranges are dropped.
+
+INDEX_VERSION = 2
+
+save_index = save_manifest
+
+
+def load_index(index_path):
+    index = load_manifest(index_path)
+    if index.get("version") != INDEX_VERSION:
+        index = {"files": {}, "version": INDEX_VERSION}
+    return index
+
+
+def lookup_range(index, file_path):
+    """Returns (min_date, max_date) if the indexed entry is still fresh, else None.
+
+    Dates are None when the file had no usable 'Date' values.
+    """
+    entry = index["files"].get(file_path)
+    if entry is None:
+        return None
+
+    stat = os.stat(file_path)
+    if entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime:
+        return None
+
+    min_date = date.fromisoformat(entry["min"]) if entry["min"] else None
+    max_date = date.fromisoformat(entry["max"]) if entry["max"] else None
+    return min_date, max_date
+
+
+def record_range(index, file_path, min_date, max_date):
+    stat = os.stat(file_path)
+    index["files"][file_path] = {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "min": min_date.isoformat() if min_date else None,
+        "max": max_date.isoformat() if max_date else None,
+    }
+
+
+def prune_index(index, seen_paths):
+    """Drops entries for files that no longer exist in the scanned folders."""
+    for file_path in [p for p in index["files"] if p not in seen_paths]:
+        del index["files"][file_path]
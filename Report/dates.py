@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+# Shared date normalisation for every stage.
+#
+# A date column has millions of rows but only ~31 distinct values, so all
+# work here is done on the unique strings and mapped back through the
+# factorize codes. The format is detected per column the way pandas infers
+# it (from the first non-null value, honouring dayfirst). It is not carried
+# over to other files: a format that happens to parse an ambiguous file
+# (05/10 as May or October) would give another result than pandas does.
+
+EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def _parse_uniques(uniques, fmt, dayfirst):
+    if fmt is None:
+        return pd.to_datetime(uniques, errors="coerce", dayfirst=dayfirst)
+    return pd.to_datetime(uniques, format=fmt, errors="coerce")
+
+
+def detect_format(uniques, dayfirst=False):
+    """Format string for these unique values (None → no single format)."""
+    non_null = [v for v in uniques if isinstance(v, str) and v.strip()]
+    return guess_datetime_format(non_null[0], dayfirst=dayfirst) if non_null else None
+
+
+def parse_dates(values, fmt=None, dayfirst=False):
+    """Parses a date column to datetime64 (unparseable → NaT), one parse per unique value.
+
+    fmt forces a format; otherwise it is detected from this column.
+    Values that are already datetimes are returned unchanged.
+    """
+    series = pd.Series(values) if not isinstance(values, pd.Series) else values
+
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    uniques = np.asarray(uniques, dtype=object)
+
+    if fmt is None and all(isinstance(v, str) for v in uniques):
+        fmt = detect_format(uniques, dayfirst)
+
+    parsed = np.asarray(_parse_uniques(uniques, fmt, dayfirst), dtype="datetime64[ns]")
+
+    # NaN codes (-1) pick the appended NaT
+    lookup = np.append(parsed, np.datetime64("NaT", "ns"))
+    return pd.Series(lookup[codes], index=series.index, name=series.name)
+
+
+def format_dates(values, fmt):
+    """strftime on the unique dates only; NaT stays NaN."""
+    series = pd.Series(values) if not isinstance(values, pd.Series) else values
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+
+    labels = np.append(pd.DatetimeIndex(uniques).strftime(fmt).to_numpy(dtype=object), np.nan)
+    return pd.Series(labels[codes], index=series.index, name=series.name)
+
+
+def to_day_index(values):
+    """Canonical integer day number (days since 1970-01-01, int32; NaT → -1)."""
+    dt = pd.Series(values).to_numpy(dtype="datetime64[D]")
+    days = (dt - EPOCH).astype("int64")
+    days[np.isnat(dt)] = -1
+    return days.astype(np.int32)
+
+
+def from_day_index(days):
+    """Inverse of to_day_index (-1 → NaT)."""
+    days = np.asarray(days, dtype="int64")
+    dt = (EPOCH + days.astype("timedelta64[D]")).astype("datetime64[ns]")
+    dt[days < 0] = np.datetime64("NaT")
+    return dt
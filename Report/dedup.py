@@ -0,0 +1,130 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Key-based duplicate removal. Each row gets a 64-bit fingerprint built from
+# the key columns followed by every other column (the row fingerprint), so
+# two rows collide only if they agree on all columns — the same rows
+# drop_duplicates() would remove. The month's fingerprints are persisted
+# as a sorted uint64 array, so appended rows are checked against earlier
+# runs without re-deduplicating the whole month.
+#
+# Readers that only parse some export columns store the fingerprint of the
+# whole raw CSV line in ROW_FINGERPRINT (line_fingerprints), so rows that
+# differ only in a skipped column (e.g. a dialer Campaign) still count as
+# different rows. Lines are hashed with their file's header: equal lines of
+# exports with the same column layout match, as they would after concat.
+
+DEDUP_KEY = ["EmpCode", "Date", "Process", "Source"]
+ROW_FINGERPRINT = "_row_fingerprint"
+LINE_CHUNK = 100_000   # raw lines held at once by line_fingerprints
+
+
+def _hashable(series):
+    # 120 and 120.0 must hash alike, as they compare equal after concat
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series.astype("float64")
+    return series
+
+
+def row_fingerprints(df, key_columns=DEDUP_KEY):
+    """uint64 fingerprint per row (key columns first, then the rest by name)."""
+    key = [c for c in key_columns if c in df.columns]
+    rest = sorted(c for c in df.columns if c not in key_columns)
+
+    normalized = {col: _hashable(df[col]) for col in key + rest}
+    return pd.util.hash_pandas_object(pd.DataFrame(normalized), index=False).to_numpy()
+
+
+def mix_fingerprints(fingerprints, *values):
+    """fingerprints combined with constant values (e.g. the file's Process)."""
+    for value in values:
+        salt = pd.util.hash_array(np.array([str(value)], dtype=object))[0]
+        fingerprints = pd.util.hash_array(np.asarray(fingerprints, dtype=np.uint64) ^ salt)
+    return fingerprints
+
+
+def _hash_lines(lines, header):
+    return mix_fingerprints(pd.util.hash_array(np.array(lines, dtype=object)), header)
+
+
+def line_fingerprints(file_path, rows, chunk_lines=LINE_CHUNK):
+    """uint64 per data row of a CSV, hashed from its raw line; rows is the parsed row count.
+
+    The file is read line by line, chunk_lines at a time, without splitting
+    fields. When the lines do not line up with the parsed rows (quoted line
+    breaks), the rows are parsed in full and hashed with raw_fingerprints.
+    """
+    parts = []
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        header = f.readline().strip()
+        batch = []
+        for line in f:
+            line = line.rstrip("\r\n")
+            if line:
+                batch.append(line)
+            if len(batch) == chunk_lines:
+                parts.append(_hash_lines(batch, header))
+                batch = []
+        if batch:
+            parts.append(_hash_lines(batch, header))
+
+    fingerprints = np.concatenate(parts) if parts else np.empty(0, dtype=np.uint64)
+    if len(fingerprints) == rows:
+        return fingerprints
+
+    return np.concatenate([
+        raw_fingerprints(chunk.rename(columns=str.strip))
+        for chunk in pd.read_csv(file_path, chunksize=chunk_lines)
+    ] or [np.empty(0, dtype=np.uint64)])
+
+
+def raw_fingerprints(df):
+    """uint64 fingerprint per row from its non-null cells and their column names.
+
+    Column order and null cells do not count, so rows of files with different
+    columns match exactly when pd.concat() + drop_duplicates() would match them.
+    """
+    total = np.zeros(len(df), dtype=np.uint64)
+    for col in df.columns:
+        series = _hashable(df[col])
+        name = pd.util.hash_array(np.array([str(col)], dtype=object))[0]
+        cells = pd.util.hash_array(pd.util.hash_pandas_object(series, index=False).to_numpy() ^ name)
+        total += np.where(series.notna().to_numpy(), cells, np.uint64(0))
+    return total
+
+
+def drop_duplicate_rows(df, key_columns=DEDUP_KEY, seen=None):
+    """Drops rows already in seen or repeated within df (first one is kept).
+
+    Rows carrying ROW_FINGERPRINT are compared by it (the column is dropped).
+    Returns (unique_df, fingerprints) — fingerprints is the sorted set of
+    seen plus the kept rows.
+    """
+    if ROW_FINGERPRINT in df.columns:
+        fingerprints = df[ROW_FINGERPRINT].to_numpy(dtype=np.uint64)
+        df = df.drop(columns=ROW_FINGERPRINT)
+    else:
+        fingerprints = row_fingerprints(df, key_columns)
+
+    keep = ~pd.Series(fingerprints).duplicated().to_numpy()
+    if seen is not None and len(seen):
+        keep &= ~np.isin(fingerprints, seen, assume_unique=False)
+
+    kept = fingerprints[keep]
+    merged = np.union1d(seen, kept) if seen is not None else np.unique(kept)
+
+    return df.loc[keep].reset_index(drop=True), merged
+
+
+def load_seen(path):
+    if not os.path.exists(path):
+        return None
+    return np.load(path)
+
+
+def save_seen(fingerprints, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp.npy"
+    np.save(tmp_path, np.asarray(fingerprints, dtype=np.uint64))
+    os.replace(tmp_path, path)
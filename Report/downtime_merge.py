@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+# Set-based downtime merge used by final.py.
+#
+# Same result as the old row loop: every login row whose
+# (EmpCode, Date, Process) has downtime gets that key's total downtime
+# added, and downtime rows whose key has no login row are appended as-is.
+# Done with one groupby, one left join and one anti-join.
+
+MERGE_KEYS = ["EmpCode", "Date", "Process"]
+
+
+def _is_categorical(series):
+    return isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def _align_key_dtypes(left, right, keys):
+    # The old dict lookup never matched values of different types; merging
+    # mismatched key dtypes would raise, so compare them as plain objects
+    for key in keys:
+        if left[key].dtype == right[key].dtype:
+            continue
+        if _is_categorical(left[key]) and _is_categorical(right[key]):
+            # Interned keys: the dictionaries are append-only, so the shorter
+            # category list is a prefix of the longer one and codes still agree
+            short, long_ = sorted([left[key].cat.categories, right[key].cat.categories], key=len)
+            if long_[:len(short)].equals(short):
+                left[key] = left[key].cat.set_categories(long_)
+                right[key] = right[key].cat.set_categories(long_)
+                continue
+        left[key] = left[key].astype(object)
+        right[key] = right[key].astype(object)
+
+
+def _add_minutes(minutes, downtime, downtime_dtype):
+    """minutes + downtime (NaN → no downtime), typed like the old row loop.
+
+    The loop added 0 to unmatched rows and let pandas infer the column, so the
+    result dtype is the common type of the login and downtime minutes
+    whenever at least one row matched.
+    """
+    matched = downtime.notna()
+    total = minutes + downtime.fillna(0)
+
+    if not matched.any():
+        return minutes
+    if minutes.dtype == object:
+        return total.astype(object)
+    return total.astype(np.result_type(minutes.dtype, downtime_dtype))
+
+
+def apply_downtime(combine_df, downtime_df):
+    """Adds downtime minutes to the login rows and appends downtime-only rows."""
+    combine_df = combine_df.copy()
+    downtime_df = downtime_df.copy()
+    _align_key_dtypes(combine_df, downtime_df, MERGE_KEYS)
+
+    # === Aggregate downtime per key (NaN keys never matched before either) ===
+    downtime_agg = (
+        downtime_df.groupby(MERGE_KEYS, sort=False, observed=True)["Minutes"]
+        .sum()
+        .rename("_downtime")
+        .reset_index()
+    )
+
+    # === Apply downtime to combined data (left join keeps login row order) ===
+    joined = combine_df.merge(downtime_agg, on=MERGE_KEYS, how="left", sort=False)
+    updated_df = joined.drop(columns="_downtime")
+    updated_df["Minutes"] = _add_minutes(updated_df["Minutes"], joined["_downtime"], downtime_agg["_downtime"].dtype)
+
+    # === Add downtime rows missing in combine (anti-join) ===
+    login_keys = combine_df[MERGE_KEYS].drop_duplicates()
+    login_keys = login_keys[login_keys.notna().all(axis=1)]
+    probe = downtime_df.merge(login_keys, on=MERGE_KEYS, how="left", indicator=True, sort=False)
+    extra_df = probe.loc[probe["_merge"].to_numpy() == "left_only", ["EmpCode", "Date", "Minutes", "Process"]]
+
+    if extra_df.empty:
+        return updated_df
+
+    return pd.concat(
+        [updated_df[["EmpCode", "Date", "Minutes", "Process"]], extra_df],
+        ignore_index=True
+    )
@@ -0,0 +1,123 @@
+import os
+import numpy as np
+import pandas as pd
+
+from dates import parse_dates, to_day_index
+
+# Date-effective EmpCode → Process mapping (media/map/proc.csv, no header):
+#
+#     EmpCode,Process[,ValidFrom[,ValidTo]]      dates yyyy-mm-dd, inclusive
+#
+# A line without dates applies to every day. Where the ranges of one EmpCode
+# overlap, the range that starts latest wins (the later line on ties), so a
+# dated move overrides an undated default for just those days.
+#
+# The entries are flattened into disjoint segments sorted by
+# (employee number, first day) and packed into one int64 key each, so all
+# login rows are looked up with a single searchsorted.
+
+OPEN_START = int(np.iinfo(np.int32).min)
+OPEN_END = int(np.iinfo(np.int32).max)
+
+PROC_DATE_FORMAT = "%Y-%m-%d"
+
+
+def _day_bounds(values, open_value):
+    """Day numbers for a ValidFrom/ValidTo column (blank → open); also the unparseable mask."""
+    parsed = parse_dates(values, fmt=PROC_DATE_FORMAT)
+    blank = values.isna().to_numpy()
+    days = to_day_index(parsed).astype(np.int64)
+    days[blank] = open_value
+    return days, parsed.isna().to_numpy() & ~blank
+
+
+def _pack(emp_idx, days):
+    # Employee number in the high 32 bits, day (shifted to be non-negative) below
+    return (emp_idx.astype(np.int64) << 32) | (days.astype(np.int64) - OPEN_START)
+
+
+def load_emp_map(proc_file):
+    """Reads proc.csv into sorted, disjoint (EmpCode, day range) → Process segments."""
+    entries = pd.read_csv(
+        proc_file, header=None, dtype=str,
+        names=["EmpCode", "Process", "ValidFrom", "ValidTo"]
+    )
+    entries = entries.apply(lambda col: col.str.strip()).replace("", np.nan)
+    entries = entries.dropna(subset=["EmpCode", "Process"]).reset_index(drop=True)
+
+    entries["start"], bad_start = _day_bounds(entries["ValidFrom"], OPEN_START)
+    entries["end"], bad_end = _day_bounds(entries["ValidTo"], OPEN_END)
+
+    bad = bad_start | bad_end | (entries["start"].to_numpy() > entries["end"].to_numpy())
+    for emp in entries.loc[bad, "EmpCode"]:
+        print(f"⚠️ proc.csv: invalid validity range for {emp} → line ignored")
+    entries = entries[~bad]
+
+    seg_emp, seg_start, seg_end, seg_process = [], [], [], []
+    emps = []
+
+    for emp, group in entries.groupby("EmpCode", sort=True):
+        starts = group["start"].to_numpy()
+        ends = group["end"].to_numpy()
+        processes = group["Process"].to_numpy()
+
+        # Later start (then later line) wins → the last covering entry in this order
+        order = np.lexsort((np.arange(len(group)), starts))
+        bounds = np.unique(np.concatenate([starts, ends + 1]))
+
+        for lo, hi in zip(bounds[:-1], bounds[1:] - 1):
+            covering = [i for i in order if starts[i] <= lo and ends[i] >= hi]
+            if covering:
+                seg_emp.append(len(emps))
+                seg_start.append(lo)
+                seg_end.append(hi)
+                seg_process.append(processes[covering[-1]])
+        emps.append(emp)
+
+    return {
+        "emps": pd.Index(emps, dtype=object),
+        "keys": _pack(np.asarray(seg_emp, dtype=np.int64), np.asarray(seg_start, dtype=np.int64)),
+        "emp": np.asarray(seg_emp, dtype=np.int64),
+        "end": np.asarray(seg_end, dtype=np.int64),
+        "process": np.asarray(seg_process, dtype=object),
+    }
+
+
+def _emp_numbers(emp_map, empcodes):
+    # Categorical EmpCode: look up each category once and expand through the codes
+    if isinstance(empcodes.dtype, pd.CategoricalDtype):
+        lookup = np.append(emp_map["emps"].get_indexer(empcodes.cat.categories), -1)
+        return lookup[empcodes.cat.codes.to_numpy()]
+    return emp_map["emps"].get_indexer(empcodes.astype(object))
+
+
+def map_processes(emp_map, empcodes, dates):
+    """Mapped Process per row (NaN where no range covers the row's EmpCode/Date).
+
+    dates are datetimes; rows with NaT only match ranges without ValidFrom.
+    """
+    emp_idx = _emp_numbers(emp_map, empcodes)
+
+    days = to_day_index(dates).astype(np.int64)
+    days[pd.isna(dates).to_numpy()] = OPEN_START
+
+    pos = np.searchsorted(emp_map["keys"], _pack(emp_idx, days), side="right") - 1
+    safe_pos = np.clip(pos, 0, None)
+
+    hit = (emp_idx >= 0) & (pos >= 0) & (len(emp_map["keys"]) > 0)
+    if len(emp_map["keys"]):
+        hit &= (emp_map["emp"][safe_pos] == emp_idx) & (days <= emp_map["end"][safe_pos])
+        mapped = emp_map["process"][safe_pos]
+    else:
+        mapped = np.full(len(days), np.nan, dtype=object)
+
+    return pd.Series(np.where(hit, mapped, np.nan), index=empcodes.index, name="Process")
+
+
+def load_remap_sources(sources_file):
+    """Upper-cased source processes whose rows are remapped (proc_sources.csv: Process)."""
+    if not os.path.exists(sources_file):
+        return set()
+
+    sources = pd.read_csv(sources_file, dtype=str)["Process"].dropna().str.strip()
+    return set(sources.str.upper())
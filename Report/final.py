@@ -1,7 +1,15 @@
-import pandas as pd
 import os
 from datetime import datetime
 
+from frames import read_frame, write_frame, frame_exists
+from downtime_merge import apply_downtime
+from aliases import load_aliases, apply_aliases
+from schemas import CHUNK_ROWS, DICTIONARY_DIR, concat_categoricals, intern_keys, intern_column, sort_by_labels
+from streaming import stream_logins
+from login_store import config_key, update_days
+from emp_map import load_emp_map, load_remap_sources, map_processes
+from dates import parse_dates
+
 # === Determine dynamic month and year ===
 today = datetime.today()
 month_abbr = today.strftime("%b").lower()
@@ -20,154 +28,161 @@ downtime_path = fr"D:\Revenue\media\downtime_combined\downtime_{month_year}.csv"
 output_dir = r"D:\Revenue\media\final_login"
 output_file = os.path.join(output_dir, f"logins_{month_year}.csv")
 
-os.makedirs(output_dir, exist_ok=True)
+# Per-day partitions of the month (see login_store.py); None disables them
+day_store_dir = os.path.join(output_dir, f"days_{month_year}")
 
-# === Read and merge combine + processed_combined ===
-combined_df_list = []
+# === Mapping files ===
+ALIAS_FILE = r"D:\Revenue\media\map\alias.csv"
+PROC_FILE = r"D:\Revenue\media\map\proc.csv"
+PROC_SOURCES_FILE = r"D:\Revenue\media\map\proc_sources.csv"
 
-for file in combine_files:
-    if os.path.exists(file):
-        print(f"📁 Reading source: {file}")
-        df = pd.read_csv(file)
-        df.columns = df.columns.str.strip()
-        combined_df_list.append(df)
-    else:
-        print(f"⚠️ Source missing: {file}")
-
-if not combined_df_list:
-    raise FileNotFoundError("❌ No main source files available. Cannot continue.")
-
-combine_df = pd.concat(combined_df_list, ignore_index=True)
-
-# === Check downtime file ===
-if not os.path.exists(downtime_path):
-    print(f"⚠️ No downtime found for month {month_year}. Proceeding without downtime merge.")
-    combine_df.to_csv(output_file, index=False)
-    print(f"✅ Final file generated: {output_file}")
-    exit()
-
-# === Load downtime ===
-print(f"🕒 Reading downtime: {downtime_path}")
-downtime_df = pd.read_csv(downtime_path)
-downtime_df.columns = downtime_df.columns.str.strip()
-downtime_df = downtime_df.rename(columns={"my_process": "Process"})
-
-# === Create lookup map ===
-downtime_map = (
-    downtime_df.groupby(["EmpCode", "Date", "Process"])["Minutes"]
-    .sum()
-    .to_dict()
-)
-
-# === Apply downtime to combined data ===
-updated_rows = []
-for idx, row in combine_df.iterrows():
-    key = (row["EmpCode"], row["Date"], row["Process"])
-    extra_minutes = downtime_map.get(key, 0)
-    row["Minutes"] = row["Minutes"] + extra_minutes
-    updated_rows.append(row)
-
-updated_df = pd.DataFrame(updated_rows)
-
-# === Add downtime rows missing in combine ===
-combine_keys = set(zip(updated_df["EmpCode"], updated_df["Date"], updated_df["Process"]))
-
-extra_rows = [
-    row for idx, row in downtime_df.iterrows()
-    if (row["EmpCode"], row["Date"], row["Process"]) not in combine_keys
-]
+EXPORT_CSV = True   # also write the human-readable CSV next to the binary copy
+LOGIN_DATE_FORMAT = "%m-%d-%Y"   # Date column of the combined / login files
 
-if extra_rows:
-    extra_df = pd.DataFrame(extra_rows)[["EmpCode", "Date", "Minutes", "Process"]]
-    final_df = pd.concat(
-        [updated_df[["EmpCode", "Date", "Minutes", "Process"]], extra_df],
-        ignore_index=True
-    )
-else:
-    final_df = updated_df
+# Streaming mode: sources are read in chunks and reduced to per-key minute
+# sums right away (see streaming.py), for months/quarters that do not fit in
+# memory. Always aggregates, even when there is no downtime file. Sources
+# are streamed from Parquet or the exported CSV; keep EXPORT_CSV on in
+# combine.py when pyarrow is not installed (an npz copy is read whole).
+STREAMING = False
+STREAM_CHUNK_ROWS = CHUNK_ROWS
+STREAM_MEMORY_MB = 512   # ceiling for the buffered partial sums of each input
+
+
+def load_sources(files=combine_files):
+    """combine + processed_combined as one interned frame."""
+    # === Read and merge combine + processed_combined ===
+    combined_df_list = []
+
+    for file in files:
+        if frame_exists(file):
+            print(f"📁 Reading source: {file}")
+            df = read_frame(file, categoricals=True)
+            df.columns = df.columns.str.strip()
+            combined_df_list.append(df)
+        else:
+            print(f"⚠️ Source missing: {file}")
+
+    return merge_sources(combined_df_list)
 
 
+def merge_sources(frames):
+    """Concatenates the source frames (dialer, processed) and interns their keys."""
+    frames = [df for df in frames if df is not None]
+    if not frames:
+        raise FileNotFoundError("❌ No main source files available. Cannot continue.")
 
-# ============================================================
-# STEP: MERGE LOGICAL PROCESSES (Go Noise & ZET)
-# ============================================================
+    return intern_keys(concat_categoricals(frames), DICTIONARY_DIR)
 
-# --- Define process groups ---
-go_noise_processes = ["Go_Noise_IB", "Go_Noise_OB"]
-kpn_processes = ["KPN_Fresh_CC", "KPN"]
-zet_processes = ["ZET_Inbound", "ZET_Inbound_Partner", "ZET_Outbound"]
-mpokket_processes = ["Mpokket_Onboarding_SE", "Mpokket_Onboarding_ST"]
-saving_processes = ["I_Pru_Saving", "I_Pru_Saving_RM"]
-protection_processes = ["I_Pru_Protection", "I_Pru_Protection_RM"]
-dish_vd2h_processes = ["D2H_and_Dish_44_-_Server", "D2H_and_Dish_25_-_Server"]
-ipru_processes = ["I-PRU_Mumbai_APR"]
 
-# --- Create a copy to avoid side effects ---
-df = final_df.copy()
+def load_downtime(path=downtime_path):
+    """The month's downtime rows (my_process renamed to Process), or None."""
+    # === Check downtime file ===
+    if not frame_exists(path):
+        print(f"⚠️ No downtime found for month {month_year}. Proceeding without downtime merge.")
+        return None
 
-# --- Normalize Go Noise ---
-df.loc[df["Process"].isin(go_noise_processes), "Process"] = "GO_NOISE"
+    # === Load downtime ===
+    print(f"🕒 Reading downtime: {path}")
+    return prepare_downtime(read_frame(path, categoricals=True))
 
-# --- Normalize ZET ---
-df.loc[df["Process"].isin(zet_processes), "Process"] = "ZET"
 
-# --- Normalize Mpokket ---
-df.loc[df["Process"].isin(mpokket_processes), "Process"] = "Mpokket"
+def prepare_downtime(downtime_df):
+    downtime_df = downtime_df.rename(columns=lambda c: c.strip())
+    return intern_keys(downtime_df.rename(columns={"my_process": "Process"}), DICTIONARY_DIR)
 
-# --- Normalize KPN ---
-df.loc[df["Process"].isin(kpn_processes), "Process"] = "KPN"
 
-# --- Normalize I_Pru_Saving ---
-df.loc[df["Process"].isin(saving_processes), "Process"] = "I-PRU Noida"
+def build_logins(combine_df, downtime_df):
+    """Final login rows: downtime merged, aliases folded, proc.csv mapping applied.
 
-# --- Normalize I_Pru_Protection ---
-df.loc[df["Process"].isin(protection_processes), "Process"] = "I-PRU Protection"
+    Without downtime the combined rows are returned as they are.
+    """
+    if downtime_df is None:
+        return combine_df
 
-# --- Normalize I_Pru_Mumbai ---
-df.loc[df["Process"].isin(ipru_processes), "Process"] = "I-PRU Mumbai"
+    # === Apply downtime (set-based merge, see downtime_merge.py) ===
+    return consolidate(apply_downtime(combine_df, downtime_df))
 
-# --- Normalize Dish TV OB and VD2H OB ---
-df.loc[df["Process"].isin(dish_vd2h_processes), "Process"] = "Dish TV OB and VD2H OB"
 
+def consolidate(final_df):
+    """Folds aliases, sums minutes per (EmpCode, Date, Process) and applies proc.csv."""
+    # ============================================================
+    # STEP: MERGE LOGICAL PROCESSES (Go Noise, ZET, KPN, I-PRU, ...)
+    # ============================================================
 
-# --- Aggregate minutes by EmpCode + Date + Process ---
-final_df = (
-    df.groupby(["EmpCode", "Date", "Process"], as_index=False)["Minutes"]
-      .sum()
-)
+    # --- Process groups come from alias.csv (Alias → Process) ---
+    aliases = load_aliases(ALIAS_FILE)
 
-print("✅ Go_Noise, ZET, KPN, I_Pru_Saving, I_Pru_Protection,  I-PRU Noida, I-PRU Mumbai, Dish TV OB and VD2H OB and Mpokket processes merged successfully")
+    # --- Create a copy to avoid side effects ---
+    df = final_df.copy()
 
-# ============================================================
-# STEP: MAP PROCESS PER EMPCODE FROM proc.csv
-# ============================================================
+    # --- Normalize every alias in one pass ---
+    df["Process"] = apply_aliases(df["Process"], aliases)
 
-proc_file = r"D:\Revenue\media\map\proc.csv"
+    # --- Aggregate minutes by EmpCode + Date + Process (rows in string order) ---
+    final_df = sort_by_labels(
+        df.groupby(["EmpCode", "Date", "Process"], as_index=False, sort=False, observed=True)["Minutes"]
+          .sum(),
+        ["EmpCode", "Date", "Process"]
+    )
+
+    if aliases:
+        print(f"✅ {', '.join(sorted(set(aliases.values())))} processes merged successfully")
+    else:
+        print(f"⚠️ {ALIAS_FILE} not found. Process merge skipped.")
+
+    # ============================================================
+    # STEP: MAP PROCESS PER EMPCODE FROM proc.csv
+    # ============================================================
 
-if os.path.exists(proc_file):
-    print("🔄 Applying Process mapping from proc.csv")
+    if os.path.exists(PROC_FILE):
+        print("🔄 Applying Process mapping from proc.csv")
 
-    # Read proc.csv (no header)
-    proc_df = pd.read_csv(proc_file, header=None, names=["EmpCode", "Mapped_Process"])
-    proc_df["EmpCode"] = proc_df["EmpCode"].str.strip()
-    proc_df["Mapped_Process"] = proc_df["Mapped_Process"].str.strip()
+        # EmpCode → Process ranges (proc.csv) and the source processes they
+        # apply to (proc_sources.csv)
+        emp_map = load_emp_map(PROC_FILE)
+        remap_sources = load_remap_sources(PROC_SOURCES_FILE)
+        if not remap_sources:
+            print(f"⚠️ {PROC_SOURCES_FILE} not found or empty. No process is remapped.")
 
-    # Create lookup dictionary
-    proc_map = dict(zip(proc_df["EmpCode"], proc_df["Mapped_Process"]))
+        mask = final_df["Process"].str.upper().isin(remap_sources).to_numpy()
+        dates = parse_dates(final_df.loc[mask, "Date"], fmt=LOGIN_DATE_FORMAT)
+        mapped = map_processes(emp_map, final_df.loc[mask, "EmpCode"], dates)
 
-    # Apply mapping ONLY where Process == ICAI
-    # mask = final_df["Process"] == "ICAI"
-    mask = final_df["Process"].str.upper().isin(["ICAI", "POSHAN_HELPLINE", "L&T SME", "NAMMA_YATRI", "BAJAJ_ALLIANZ-NOIDA", "MAX_LIFE-SDPL"])
+        process = final_df["Process"].astype(object)
+        process[mask] = mapped.fillna(process[mask])
+        final_df["Process"] = intern_column(process, "Process", DICTIONARY_DIR)
 
-    final_df.loc[mask, "Process"] = final_df.loc[mask, "EmpCode"].map(proc_map)\
-        .fillna(final_df.loc[mask, "Process"])
+        print("✅ Process mapping applied successfully")
 
-    print("✅ Process mapping applied successfully")
+    else:
+        print("⚠️ proc.csv not found. Mapping skipped.")
+
+    return final_df
 
-else:
-    print("⚠️ proc.csv not found. Mapping skipped.")
 
-# === Save output ===
-final_df.to_csv(output_file, index=False)
+def save_logins(final_df, path=output_file):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_frame(final_df, path, EXPORT_CSV)
+    print(f"✅ Final merged login file saved at: {path}")
 
-print(f"✅ Final merged login file saved at: {output_file}")
+
+def main():
+    if STREAMING:
+        print(f"🌊 Streaming mode: {STREAM_CHUNK_ROWS} rows per chunk, {STREAM_MEMORY_MB} MB for partial sums")
+        final_df = consolidate(
+            stream_logins(combine_files, downtime_path, DICTIONARY_DIR, STREAM_CHUNK_ROWS, STREAM_MEMORY_MB)
+        )
+    else:
+        combine_df, downtime_df = load_sources(), load_downtime()
+        if day_store_dir and downtime_df is not None:
+            key = config_key([ALIAS_FILE, PROC_FILE, PROC_SOURCES_FILE])
+            final_df = update_days(day_store_dir, combine_df, downtime_df, build_logins, LOGIN_DATE_FORMAT, key)
+        else:
+            final_df = build_logins(combine_df, downtime_df)
+    save_logins(final_df)
+    return final_df
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Typed binary storage for the intermediates passed between stages
+# (combine_*, downtime_*, processed_*, final_login/logins_*).
+#
+# Every intermediate keeps its .csv path as its public name. write_frame()
+# stores a binary copy next to it (Parquet when pyarrow is installed,
+# otherwise a NumPy .npz) and, unless told not to, the CSV for humans.
+# read_frame() prefers the binary copy when it is at least as new as the CSV,
+# so later stages skip text parsing and get the original dtypes back.
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+# "auto" → parquet if available else npz; "csv" disables binary copies
+INTERMEDIATE_FORMAT = "auto"
+
+
+def _binary_format(fmt=None):
+    fmt = fmt or INTERMEDIATE_FORMAT
+    if fmt == "auto":
+        return "parquet" if HAS_PARQUET else "npz"
+    return fmt
+
+
+def binary_path(csv_path, fmt):
+    return os.path.splitext(csv_path)[0] + f".{fmt}"
+
+
+# ===== NPZ CODEC =====
+# Each column is stored as plain arrays (no pickle for ordinary data):
+#   numbers/bools → values, datetimes → int64 ns, strings → codes + unique values
+
+def _encode_column(series, key, arrays):
+    dtype = series.dtype
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        arrays[f"{key}_codes"] = series.cat.codes.to_numpy()
+        arrays[f"{key}_cats"] = np.asarray(series.cat.categories.astype(str), dtype=str)
+        return {"kind": "category"}
+
+    if pd.api.types.is_datetime64_dtype(dtype):
+        arrays[f"{key}_values"] = series.to_numpy(dtype="datetime64[ns]").view("int64")
+        return {"kind": "datetime"}
+
+    if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        if isinstance(dtype, np.dtype):
+            arrays[f"{key}_values"] = series.to_numpy()
+            return {"kind": "numpy"}
+
+    values = series.to_numpy(dtype=object)
+    notna = pd.notna(values)
+    if all(isinstance(v, str) for v in values[notna]):
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        arrays[f"{key}_codes"] = codes.astype(np.int32)
+        arrays[f"{key}_cats"] = np.asarray(uniques, dtype=str)
+        return {"kind": "string"}
+
+    # Mixed Python objects: keep them as-is (needs pickle on load)
+    arrays[f"{key}_values"] = values
+    return {"kind": "object"}
+
+
+def _decode_column(spec, key, data):
+    kind = spec["kind"]
+
+    if kind == "numpy":
+        return data[f"{key}_values"]
+    if kind == "datetime":
+        return data[f"{key}_values"].view("datetime64[ns]")
+    if kind == "object":
+        return data[f"{key}_values"]
+
+    codes = data[f"{key}_codes"]
+    cats = data[f"{key}_cats"].astype(object)
+
+    if kind == "category":
+        return pd.Categorical.from_codes(codes, categories=cats)
+
+    values = np.empty(len(codes), dtype=object)
+    values[:] = np.nan
+    valid = codes >= 0
+    values[valid] = cats[codes[valid]]
+    return values
+
+
+def _write_npz(df, path):
+    arrays = {}
+    specs = []
+    for i, col in enumerate(df.columns):
+        spec = _encode_column(df[col], f"c{i}", arrays)
+        spec["name"] = col
+        specs.append(spec)
+
+    arrays["__meta__"] = np.array(json.dumps({"columns": specs, "rows": len(df)}))
+
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+def _npz_meta(path):
+    # np.load is lazy: only the arrays that are accessed are read
+    with np.load(path, allow_pickle=True) as data:
+        return json.loads(str(data["__meta__"]))
+
+
+def _read_npz(path, wanted=None):
+    with np.load(path, allow_pickle=True) as data:
+        meta = json.loads(str(data["__meta__"]))
+        columns = {}
+        for i, spec in enumerate(meta["columns"]):
+            if wanted is None or wanted(spec["name"]):
+                columns[spec["name"]] = _decode_column(spec, f"c{i}", data)
+
+    return pd.DataFrame(columns, index=pd.RangeIndex(meta["rows"]))
+
+
+# ===== PUBLIC API =====
+
+def write_frame(df, csv_path, export_csv=True, fmt=None):
+    """Saves df as a typed binary intermediate and (optionally) as CSV."""
+    os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
+    df = df.reset_index(drop=True)
+    fmt = _binary_format(fmt)
+
+    # CSV first: the binary copy must not be older than the CSV to be used
+    if export_csv or fmt == "csv":
+        df.to_csv(csv_path, index=False)
+
+    if fmt == "parquet":
+        try:
+            df.to_parquet(binary_path(csv_path, "parquet"), index=False)
+        except Exception as e:
+            print(f"⚠️ Parquet write failed ({e}) → Using npz for {csv_path}")
+            fmt = "npz"
+
+    if fmt == "npz":
+        _write_npz(df, binary_path(csv_path, "npz"))
+
+
+def _fresh_binary(csv_path):
+    csv_mtime = os.path.getmtime(csv_path) if os.path.exists(csv_path) else None
+
+    for fmt in ("parquet", "npz"):
+        path = binary_path(csv_path, fmt)
+        if fmt == "parquet" and not HAS_PARQUET:
+            continue
+        if os.path.exists(path) and (csv_mtime is None or os.path.getmtime(path) >= csv_mtime):
+            return fmt, path
+
+    return None, None
+
+
+def frame_exists(csv_path):
+    return os.path.exists(csv_path) or _fresh_binary(csv_path)[0] is not None
+
+
+def read_frame(csv_path, categoricals=False, **csv_kwargs):
+    """Loads an intermediate, from its binary copy when fresh, else from CSV.
+
+    Categorical columns come back as plain object columns unless
+    categoricals=True. csv_kwargs are only used for the CSV fallback.
+    """
+    fmt, path = _fresh_binary(csv_path)
+
+    if fmt == "parquet":
+        df = pd.read_parquet(path)
+    elif fmt == "npz":
+        df = _read_npz(path)
+    else:
+        return pd.read_csv(csv_path, **csv_kwargs)
+
+    if not categoricals:
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype(object)
+
+    return df
+
+
+def iter_frame(csv_path, chunk_rows, columns=None):
+    """Yields an intermediate in chunks of at most chunk_rows rows.
+
+    Parquet is read batch by batch and the CSV with chunksize. An npz copy
+    cannot be read partially, so next to a CSV the CSV is streamed instead
+    (string columns kept as text); an npz without CSV is loaded (wanted
+    columns only) and sliced. columns limits the columns read (names are
+    compared stripped); categoricals come back as stored.
+    """
+    fmt, path = _fresh_binary(csv_path)
+    wanted = (lambda c: c.strip() in columns) if columns is not None else None
+
+    if fmt == "npz" and os.path.exists(csv_path):
+        text = {spec["name"]: str for spec in _npz_meta(path)["columns"] if spec["kind"] in ("category", "string")}
+        yield from pd.read_csv(csv_path, chunksize=chunk_rows, usecols=wanted, dtype=text)
+        return
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        names = [c for c in parquet_file.schema_arrow.names if wanted is None or wanted(c)]
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=names):
+            yield batch.to_pandas()
+    elif fmt == "npz":
+        df = _read_npz(path, wanted)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+    else:
+        yield from pd.read_csv(csv_path, chunksize=chunk_rows, usecols=wanted)
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+# Vectorized billable headcount for the revenue scripts.
+#
+# An agent counts 1 on a day when their minutes reach the process's Billable
+# minutes, and 0.5 when they reach half of it. index_logins() groups the
+# month's login rows by Process once. daily_headcount() then sums the
+# credits of one process per date with a single bincount, instead of
+# filtering by process and date and calling iterrows() for every agent.
+#
+# Credits are multiples of 0.5, so the float sums are exact, and the
+# revenue values below equal the old math.ceil() results bit for bit.
+
+
+def _stripped_processes(process):
+    # A map.csv process takes the login rows whose Process matches it stripped
+    if isinstance(process.dtype, pd.CategoricalDtype):
+        codes, uniques = pd.factorize(process.cat.categories.astype(str).str.strip())
+        row_codes = process.cat.codes.to_numpy()
+        stripped = np.where(row_codes >= 0, codes[row_codes], -1)
+        return pd.Categorical.from_codes(stripped, categories=uniques)
+    return process.str.strip().to_numpy()
+
+
+def index_logins(login_df, date_list):
+    """{process: (date positions in date_list, minutes, EmpCode series)} for the login rows."""
+    date_pos = pd.Index(date_list).get_indexer(login_df["Date"])
+    minutes = login_df["Minutes"].to_numpy()
+    empcodes = login_df["EmpCode"].reset_index(drop=True)
+    processes = pd.Series(_stripped_processes(login_df["Process"]))
+
+    logins = {}
+    for process, positions in processes.groupby(processes, observed=True, sort=False).indices.items():
+        logins[process] = (date_pos[positions], minutes[positions], empcodes.iloc[positions])
+    return logins
+
+
+def daily_headcount(logins, process, billable, n_dates):
+    """Full + half credits of a process for each date."""
+    if process not in logins:
+        return np.zeros(n_dates)
+
+    date_pos, minutes, _ = logins[process]
+    credit = np.where(minutes >= billable, 1.0, np.where(minutes >= billable / 2, 0.5, 0.0))
+    return np.bincount(date_pos, weights=credit, minlength=n_dates)
+
+
+def headcount_grid(logins, process, thresholds, n_dates):
+    """daily_headcount() for several Billable thresholds at once: a len(thresholds) × n_dates array.
+
+    The thresholds are broadcast against the process's login minutes and all
+    rows summed with one bincount over (threshold, date); each row equals
+    daily_headcount() with that threshold.
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    if process not in logins or not len(thresholds):
+        return np.zeros((len(thresholds), n_dates))
+
+    date_pos, minutes, _ = logins[process]
+    limits = thresholds[:, None]
+    credit = np.where(minutes >= limits, 1.0, np.where(minutes >= limits / 2, 0.5, 0.0))
+
+    keys = np.arange(len(thresholds))[:, None] * n_dates + date_pos
+    counts = np.bincount(keys.ravel(), weights=credit.ravel(), minlength=len(thresholds) * n_dates)
+    return counts.reshape(len(thresholds), n_dates)
+
+
+def category_headcounts(logins, process, billable, n_dates, categories_of, n_categories):
+    """Credits of a process per (category, date) as an n_categories × n_dates array.
+
+    categories_of maps an EmpCode to the positions of its categories. The
+    login rows are joined to it once and summed with one bincount over
+    (category, date), instead of an isin() per category; an agent listed
+    in two categories counts in both.
+    """
+    if process not in logins or not n_categories:
+        return np.zeros((n_categories, n_dates))
+
+    date_pos, minutes, emps = logins[process]
+    credit = np.where(minutes >= billable, 1.0, np.where(minutes >= billable / 2, 0.5, 0.0))
+
+    codes, uniques = pd.factorize(emps)
+    members = [categories_of.get(e, ()) for e in uniques] + [()]  # last: NaN EmpCode (code -1)
+    lengths = np.array([len(m) for m in members], dtype=np.int64)
+    offsets = np.cumsum(lengths) - lengths
+    flat = np.fromiter((c for m in members for c in m), dtype=np.int64, count=int(lengths.sum()))
+
+    # One joined row per (login row, category of its EmpCode), login rows in order
+    row_lengths = lengths[codes]
+    rows = np.repeat(np.arange(len(codes)), row_lengths)
+    within = np.arange(len(rows)) - np.repeat(np.cumsum(row_lengths) - row_lengths, row_lengths)
+    category = flat[np.repeat(offsets[codes], row_lengths) + within]
+
+    counts = np.bincount(category * n_dates + date_pos[rows], weights=credit[rows],
+                         minlength=n_categories * n_dates)
+    return counts.reshape(n_categories, n_dates)
+
+
+def capped(counts, cap):
+    """min(count, cap) per date, with Python's min() semantics (cap only if cap < count)."""
+    return np.where(cap < counts, cap, counts)
+
+
+def ceil_revenue(counts, cost, mandays, extra=0, when=None):
+    """math.ceil((count × cost + extra) / mandays) per date, 0 where when is False.
+
+    when defaults to count != 0 (the scripts' "if empcount"). Returns ints.
+    """
+    when = counts != 0 if when is None else when
+    if not when.any():
+        return np.zeros(len(counts), dtype=np.int64)
+    if mandays == 0:
+        raise ZeroDivisionError("float division by zero")
+
+    values = counts * cost
+    if extra:
+        values = values + extra
+    values = values / mandays
+
+    if not np.isfinite(values[when]).all():
+        raise ValueError("cannot convert float NaN or infinity to integer")
+    return np.where(when, np.ceil(values), 0).astype(np.int64)
+
+
+def deficits(daily_target, revenue):
+    """round((target - revenue) / target, 3) per date (Python rounding), 0 without a target."""
+    if not daily_target:
+        return [0] * len(revenue)
+    return [round((daily_target - r) / daily_target, 3) for r in revenue]
@@ -0,0 +1,143 @@
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+
+from frames import write_frame, read_frame, frame_exists, binary_path
+from manifest import content_hash, load_manifest, save_manifest
+from dedup import row_fingerprints
+from dates import parse_dates
+from schemas import concat_categoricals, sort_by_labels
+
+# Per-day partitions of the consolidated login month:
+#
+#     final_login/days_<mon><yyyy>/<yyyy-mm-dd>.<parquet|npz>
+#     final_login/days_<mon><yyyy>/meta.json
+#
+# meta.json keeps, per day, a digest of that day's source rows (combined,
+# processed and downtime) plus a key for the mapping files (alias.csv,
+# proc.csv, ...). Every step of final.py works within one Date, so a run
+# recomputes only the days whose digest changed; all other days are read
+# back from their partitions. Readers can load one day or a range of days.
+# Rows whose Date does not parse belong to no day: they are rebuilt on
+# every run and are not stored.
+
+STORE_VERSION = 2
+META_FILE = "meta.json"
+
+
+def config_key(paths):
+    """Digest of the mapping files a day's result depends on (missing → "-")."""
+    h = hashlib.sha1(str(STORE_VERSION).encode())
+    for path in paths:
+        h.update((content_hash(path) if os.path.exists(path) else "-").encode())
+    return h.hexdigest()
+
+
+def _day_labels(dates, date_format):
+    """Date label → yyyy-mm-dd for every parseable label in dates."""
+    labels = pd.Series(pd.unique(dates.dropna().astype(object)), dtype=object)
+    iso = parse_dates(labels, fmt=date_format).dt.strftime("%Y-%m-%d")
+    return {label: day for label, day in zip(labels, iso) if isinstance(day, str)}
+
+
+def day_digests(frames, date_format):
+    """{yyyy-mm-dd: digest of that day's rows in every frame}."""
+    parts = {}
+    for tag, df in enumerate(frames):
+        if df is None or df.empty:
+            continue
+
+        days = df["Date"].astype(object).map(_day_labels(df["Date"], date_format))
+        fingerprints = row_fingerprints(df)
+
+        for day, positions in days.groupby(days, sort=False).indices.items():
+            digest = hashlib.sha1(np.sort(fingerprints[positions]).tobytes()).hexdigest()
+            parts.setdefault(day, []).append(f"{tag}:{digest}")
+
+    return {day: hashlib.sha1("|".join(sorted(p)).encode()).hexdigest() for day, p in parts.items()}
+
+
+def partition_path(store_dir, day):
+    return os.path.join(store_dir, f"{day}.csv")
+
+
+def _remove_partition(store_dir, day):
+    for fmt in ("csv", "parquet", "npz"):
+        path = binary_path(partition_path(store_dir, day), fmt)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def update_days(store_dir, sources, downtime_df, build, date_format, key):
+    """Recomputes the changed days with build(sources, downtime_df); returns the month.
+
+    sources is the concatenated combine/processed frame. The month comes
+    back in the same row order as build() on the full inputs.
+    """
+    meta_path = os.path.join(store_dir, META_FILE)
+    meta = load_manifest(meta_path)
+    if meta.get("config") != key:
+        meta = {"files": {}, "config": key, "days": {}}
+
+    digests = day_digests([sources, downtime_df], date_format)
+    stored = meta.setdefault("days", {})
+
+    changed = sorted(
+        day for day, digest in digests.items()
+        if stored.get(day) != digest or not frame_exists(partition_path(store_dir, day))
+    )
+    for day in set(stored) - set(digests):
+        _remove_partition(store_dir, day)
+        del stored[day]
+
+    label_days = _day_labels(
+        pd.concat([sources["Date"].astype(object), downtime_df["Date"].astype(object)]), date_format
+    )
+    changed_labels = [label for label, day in label_days.items() if day in set(changed)]
+
+    def rebuilt(df):
+        # Rows of the changed days and the undated ones
+        dates = df["Date"].astype(object)
+        return (dates.isin(changed_labels) | ~dates.isin(list(label_days))).to_numpy()
+
+    source_rows, downtime_rows = rebuilt(sources), rebuilt(downtime_df)
+    undated = sum(int((~df["Date"].astype(object).isin(list(label_days))).sum()) for df in (sources, downtime_df))
+
+    print(f"📆 Login days: {len(changed)} recomputed, {len(digests) - len(changed)} reused")
+    if undated:
+        print(f"⚠️ {undated} rows with an unparseable Date → Rebuilt, not stored")
+
+    frames = []
+    if source_rows.any() or downtime_rows.any():
+        result = build(
+            sources[source_rows].reset_index(drop=True),
+            downtime_df[downtime_rows].reset_index(drop=True)
+        )
+        result_days = result["Date"].astype(object).map(label_days)
+
+        for day in changed:
+            day_df = result[(result_days == day).to_numpy()]
+            write_frame(day_df, partition_path(store_dir, day), export_csv=False)
+            stored[day] = digests[day]
+        frames.append(result)
+
+    for day in sorted(set(digests) - set(changed)):
+        frames.append(read_frame(partition_path(store_dir, day), categoricals=True))
+
+    save_manifest(meta, meta_path)
+
+    # build() orders rows by EmpCode, Date and then its own Process order
+    # within a day; a stable sort on the first two restores the month order
+    return sort_by_labels(concat_categoricals(frames), ["EmpCode", "Date"])
+
+
+def read_days(store_dir, start=None, end=None):
+    """Consolidated logins of the stored days in [start, end] (yyyy-mm-dd, inclusive)."""
+    meta = load_manifest(os.path.join(store_dir, META_FILE))
+    days = [
+        day for day in sorted(meta.get("days", {}))
+        if (start is None or day >= start) and (end is None or day <= end)
+    ]
+    frames = [read_frame(partition_path(store_dir, day), categoricals=True) for day in days]
+    return concat_categoricals(frames) if frames else None
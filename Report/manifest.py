@@ -0,0 +1,125 @@
+import os
+import json
+import hashlib
+import pandas as pd
+
+# Ingestion manifest: remembers every source file already parsed into a
+# month's store (path, size, mtime, content hash, row count), so a rerun
+# only parses files that are new or changed.
+
+HASH_CHUNK = 1024 * 1024
+
+
+def content_hash(file_path):
+    """SHA-1 of the file contents, read in chunks."""
+    h = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_manifest(manifest_path):
+    """Loads the manifest JSON, or an empty manifest if none exists yet."""
+    if not os.path.exists(manifest_path):
+        return {"files": {}}
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Unreadable manifest {manifest_path} ({e}) → Rebuilding")
+        return {"files": {}}
+
+    manifest.setdefault("files", {})
+    return manifest
+
+
+def save_manifest(manifest, manifest_path):
+    """Writes the manifest atomically (temp file + replace)."""
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def is_unchanged(manifest, file_path):
+    """True if file_path was ingested before and its contents did not change.
+
+    Size + mtime is checked first; the content hash is only computed when
+    the stat differs (e.g. the file was copied again with the same bytes).
+    """
+    entry = manifest["files"].get(file_path)
+    if entry is None:
+        return False
+
+    stat = os.stat(file_path)
+    if entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+        return True
+
+    if entry["size"] != stat.st_size:
+        return False
+
+    if content_hash(file_path) == entry["hash"]:
+        # Same bytes, new timestamp → refresh stat so next run takes the fast path
+        entry["mtime"] = stat.st_mtime
+        return True
+
+    return False
+
+
+def record_file(manifest, file_path, rows, part_path):
+    """Records a freshly parsed file and where its parsed rows are stored.
+
+    part_path may be a list when one source file feeds several parts.
+    """
+    stat = os.stat(file_path)
+    manifest["files"][file_path] = {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "hash": content_hash(file_path),
+        "rows": int(rows),
+        "part": part_path,
+    }
+
+
+def entry_parts(entry):
+    part = entry.get("part")
+    if not part:
+        return []
+    return part if isinstance(part, list) else [part]
+
+
+def drop_parts(manifest, file_path):
+    """Deletes the stored parts of file_path (e.g. before re-ingesting it)."""
+    entry = manifest["files"].get(file_path)
+    if entry is None:
+        return
+    for part_path in entry_parts(entry):
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+
+def part_path_for(store_dir, file_path):
+    """Stable part file name for a source file inside the month store."""
+    key = hashlib.sha1(file_path.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(store_dir, f"{key}.pkl")
+
+
+def write_part(df, part_path):
+    os.makedirs(os.path.dirname(part_path), exist_ok=True)
+    df.to_pickle(part_path)
+
+
+def read_part(part_path):
+    return pd.read_pickle(part_path)
+
+
+def forget_missing(manifest, seen_paths):
+    """Drops entries (and their parts) for files no longer in the source folders."""
+    removed = [p for p in manifest["files"] if p not in seen_paths]
+    for file_path in removed:
+        drop_parts(manifest, file_path)
+        del manifest["files"][file_path]
+    return removed
@@ -0,0 +1,48 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Worker-pool helper for file parsing. Results always come back in task
+# order, so output built from them is identical to a serial run.
+
+# Leave one core for the main process; 1 means serial (no pool)
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+
+
+def _call(func, args):
+    try:
+        return func(*args), None
+    except Exception as e:
+        return None, e
+
+
+def map_ordered(func, tasks, workers=DEFAULT_WORKERS, max_in_flight=None):
+    """Runs func(*args) for every args tuple in tasks and yields
+    (args, result, error) in the same order as tasks.
+
+    At most max_in_flight tasks (default 2 × workers) are submitted or
+    waiting to be consumed at once, which bounds how many parsed frames sit
+    in memory. func must be a top-level function of an importable module.
+    """
+    tasks = list(tasks)
+
+    if workers <= 1 or len(tasks) <= 1:
+        for args in tasks:
+            result, error = _call(func, args)
+            yield args, result, error
+        return
+
+    max_in_flight = max(1, max_in_flight or workers * 2)
+    pending = deque()
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        for args in tasks:
+            pending.append((args, pool.submit(_call, func, args)))
+
+            if len(pending) >= max_in_flight:
+                done_args, future = pending.popleft()
+                yield (done_args, *future.result())
+
+        while pending:
+            done_args, future = pending.popleft()
+            yield (done_args, *future.result())
@@ -0,0 +1,70 @@
+import sys
+import time
+
+import combine
+import final
+import revenue
+
+# Single-process runner: combine → final → revenue (→ transfer).
+#
+# Each stage hands its DataFrame straight to the next one instead of writing
+# a CSV that the next script parses again. The stand-alone scripts are
+# unchanged and still work on the files in D:\Revenue\media.
+#
+#     python pipeline.py          # REVENUE_PRESET below
+#     python pipeline.py z2       # another preset
+
+# ===== CONFIG =====
+REVENUE_PRESET = "z3"       # x, y, z, z1, z2 or z3 (revenue_engine.PRESETS)
+RUN_TRANSFER = False        # upload D:\Revenue\media\report afterwards (transfer.py)
+
+# Intermediates to write to disk as well; the revenue report is always written
+MATERIALIZE = {
+    "combine": False,       # combined / downtime_combined / processed_combined
+    "final": False,         # final_login/logins_<mon><yyyy>.csv
+}
+
+
+def _timed(label, func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    print(f"⏱ {label}: {time.perf_counter() - started:.1f}s")
+    return result
+
+
+def run(preset=REVENUE_PRESET, materialize=MATERIALIZE, transfer=RUN_TRANSFER):
+    """Runs every stage in this process; returns the revenue DataFrame."""
+    # === Combine ===
+    month_str, month_name_short, year_str, start, end = combine.get_month_range()
+    print(f"\n📌 Pipeline for: {month_name_short.upper()}-{year_str} ({start} → {end}), revenue preset {preset}\n")
+
+    processes = combine.read_processes()
+    write = materialize.get("combine", False)
+
+    dialer_df = _timed("dialer", combine.combine_dialer, processes, month_str, month_name_short, year_str, write=write)
+    downtime_df = _timed("downtime", combine.combine_downtime, start, end, month_name_short, year_str, write=write)
+    processed_df = _timed("processed", combine.combine_processed, processes, start, end, month_name_short, year_str, write=write)
+
+    # === Final logins ===
+    combine_df = final.merge_sources([dialer_df, processed_df])
+    if downtime_df is not None:
+        downtime_df = final.prepare_downtime(downtime_df)
+
+    login_df = _timed("final", final.build_logins, combine_df, downtime_df)
+    if materialize.get("final", False):
+        final.save_logins(login_df)
+
+    # === Revenue ===
+    df_out = _timed("revenue", revenue.main, login_df, preset=preset)
+
+    # === Transfer ===
+    if transfer:
+        import transfer as sftp
+        sftp.upload_directory_sftp(sftp.local_dir, sftp.remote_dir)
+
+    return df_out
+
+
+# Guard required: combine's worker processes (spawn on Windows) re-import this module
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else REVENUE_PRESET)
@@ -0,0 +1,98 @@
+import pandas as pd
+
+from dates import parse_dates, format_dates
+from xlsx_cache import read_excel_cached
+from dedup import ROW_FINGERPRINT, mix_fingerprints
+from schemas import DIALER_SCHEMA, DOWNTIME_SCHEMA, SchemaError, read_csv_with_schema
+
+# Per-file readers used by combine.py. They live in their own module so the
+# worker pool (parallel.py) can import them without re-running combine.py.
+# Readers never print; they return what the caller needs to log.
+
+
+def extract_date_from_processed(df, file_path):
+    """Extracts latest valid date from the 'Date' column (flexible format).
+
+    Returns (date, warning) — date is None when the file should be skipped.
+    """
+    if "Date" not in df.columns:
+        return None, f"⚠️ Missing 'Date' column → Skipping {file_path}"
+
+    try:
+        df["Date"] = parse_dates(df["Date"], dayfirst=True)
+    except:
+        return None, f"❌ Could not convert Date format in: {file_path}"
+
+    valid_dates = df["Date"].dropna()
+
+    if valid_dates.empty:
+        return None, f"⚠️ No valid dates found in {file_path}"
+
+    return valid_dates.max().date(), None
+
+
+def read_dialer_file(file_path, process):
+    """Reads the schema columns of one dialer *_APR.csv and tags it with its process.
+
+    ROW_FINGERPRINT identifies the whole export row for deduplication.
+    """
+    df = read_csv_with_schema(file_path, DIALER_SCHEMA, fingerprint=True)
+    fingerprints = df.pop(ROW_FINGERPRINT).to_numpy()
+    df["Process"] = process
+    df["Source"] = "Dialer"
+    df[ROW_FINGERPRINT] = mix_fingerprints(fingerprints, process, "Dialer")
+    return df
+
+
+def split_downtime_file(file_path):
+    """Reads one downtime CSV and splits its dated rows into month partitions.
+
+    Returns (parts, warning) — parts maps "YYYY-MM" → that month's rows,
+    with Date already parsed and the whole row's ROW_FINGERPRINT.
+    """
+    try:
+        df = read_csv_with_schema(file_path, DOWNTIME_SCHEMA, fingerprint=True)
+    except SchemaError as e:
+        return {}, f"⚠️ {e} → Skipping {file_path}"
+
+    df["Date"] = parse_dates(df["Date"])
+    df = df[df["Date"].notna()]
+
+    month_keys = format_dates(df["Date"], "%Y-%m")
+    return {key: part for key, part in df.groupby(month_keys, sort=True)}, None
+
+
+def read_processed_file(file_path, process, start, end, xlsx_cache_dir=None):
+    """Reads one processed CSV/XLSX and keeps it if its latest date is in start..end.
+
+    Workbooks are served from xlsx_cache_dir (see xlsx_cache.py) when given.
+
+    Returns (df, date_range, warning) — df is None when the file is skipped,
+    date_range is (min_date, max_date) of the file's 'Date' column, or
+    (None, None) when it has no usable dates.
+    """
+    if file_path.endswith(".csv"):
+        df = pd.read_csv(file_path)
+    elif xlsx_cache_dir:
+        df = read_excel_cached(file_path, xlsx_cache_dir)
+    else:
+        df = pd.read_excel(file_path)
+
+    # Extract latest date from file
+    extracted_date, warning = extract_date_from_processed(df, file_path)
+
+    if not extracted_date:
+        return None, (None, None), warning
+
+    first_date = df["Date"].dropna().min().date()
+
+    # Check if extracted date falls in previous month
+    if not (start.date() <= extracted_date <= end.date()):
+        return None, (first_date, extracted_date), None
+
+    # Date is already parsed by extract_date_from_processed
+    df["Date"] = format_dates(df["Date"], "%m-%d-%Y")
+
+    df["Process"] = process
+    df["Source"] = "Processed"
+    return df, (first_date, extracted_date), None
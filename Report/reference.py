@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+# Keyed indexes over the revenue reference tables, built once per run so the
+# process loop does dictionary lookups instead of filtering DataFrames:
+#
+#   meta.csv   (Process, month) → (FTE Cap, Mandays)
+#   cost.csv   (Process, month, Cost) → headcount and {Category: EmpCodes}
+#
+# Months are keyed lower case. Where a table has several rows for one key,
+# the first row in file order wins, as the DataFrame filters it replaces did.
+
+
+def index_meta(meta_df):
+    """(Process, month) → (FTE Cap, Mandays) from meta.csv."""
+    index = {}
+    keys = zip(meta_df['Process'], meta_df['Month'].str.strip().str.lower())
+    for key, fte_cap, mandays in zip(keys, meta_df['FTE Cap'], meta_df['Mandays']):
+        if key not in index:
+            index[key] = (float(fte_cap), float(mandays))
+    return index
+
+
+def index_costs(cost_df):
+    """(Process, month, Cost) → {"count", "categories"} from cost.csv.
+
+    categories maps each Category to [first row, its Cost, EmpCodes]; rows without a
+    Category (or a cost.csv without the column) only count.
+    """
+    index = {}
+    if cost_df is None:
+        return index
+
+    categories = cost_df['Category'] if 'Category' in cost_df.columns else pd.Series(np.nan, index=cost_df.index)
+    rows = zip(cost_df['Process'], cost_df['Month'], cost_df['Cost'], categories, cost_df['EmpCode'])
+
+    for position, (process, month, cost, category, empcode) in enumerate(rows):
+        if pd.isna(cost):
+            continue
+        entry = index.setdefault((process, month, cost), {"count": 0, "categories": {}})
+        entry["count"] += 1
+        if pd.notna(category):
+            entry["categories"].setdefault(category, [position, cost, set()])[2].add(empcode)
+    return index
+
+
+def _cost_entries(cost_index, process, month, allowed_costs):
+    entries = {}
+    for cost in allowed_costs:
+        entry = cost_index.get((process, month, cost))
+        if entry is not None:
+            entries[cost] = entry
+    return entries
+
+
+def cost_counts(cost_index, process, month, allowed_costs):
+    """Costs of a process among allowed_costs (ascending) and their headcounts."""
+    entries = _cost_entries(cost_index, process, month, allowed_costs)
+    costs = sorted(entries)
+    return np.array(costs, dtype=float), np.array([entries[c]["count"] for c in costs], dtype=np.int64)
+
+
+def cost_categories(cost_index, process, month, allowed_costs):
+    """Category → (cost of its first cost.csv row, EmpCodes), sorted by Category."""
+    merged = {}
+    for entry in _cost_entries(cost_index, process, month, allowed_costs).values():
+        for category, (position, cost, empcodes) in entry["categories"].items():
+            current = merged.get(category)
+            if current is None:
+                merged[category] = [position, cost, set(empcodes)]
+            else:
+                if position < current[0]:
+                    current[0], current[1] = position, cost
+                current[2] |= empcodes
+
+    return {category: (merged[category][1], merged[category][2]) for category in sorted(merged)}
+
+
+def empcode_categories(empcode_sets):
+    """Reverse index: EmpCode → positions of the categories (in empcode_sets order) listing it."""
+    index = {}
+    for position, empcodes in enumerate(empcode_sets):
+        for empcode in empcodes:
+            index.setdefault(empcode, []).append(position)
+    return index
@@ -0,0 +1,87 @@
+import os
+import time
+import hashlib
+
+from frames import write_frame, read_frame, frame_exists, binary_path
+from manifest import content_hash
+from dedup import row_fingerprints
+
+# Content-addressed cache of finished revenue reports:
+#
+#     cache/revenue/<key>.<parquet|npz>
+#
+# The key is a digest of every input of a report: the contents of the
+# reference files (map.csv, meta.csv, cost.csv, rules.csv), the login rows,
+# the preset, the month and the engine version. A rerun with unchanged
+# inputs reads the stored report instead of computing it. A hit refreshes
+# the entry's mtime; entries older than max_age_days go first, then the
+# least recently used ones until the cache fits in max_mb.
+
+CACHE_VERSION = 1
+
+
+def frame_digest(df):
+    """Digest of a DataFrame's column names and rows (in order)."""
+    h = hashlib.sha1("|".join(map(str, df.columns)).encode())
+    h.update(row_fingerprints(df).tobytes())
+    return h.hexdigest()
+
+
+def cache_key(paths, login_df, *params):
+    """Digest of the files in paths (missing → "-"), the login rows and params."""
+    h = hashlib.sha1(str(CACHE_VERSION).encode())
+    for path in paths:
+        h.update((content_hash(path) if os.path.exists(path) else "-").encode())
+    h.update(frame_digest(login_df).encode())
+    for param in params:
+        h.update(f"|{param}".encode())
+    return h.hexdigest()
+
+
+def _entry_path(cache_dir, key):
+    # frames names the binary copy after the .csv path; no CSV is written
+    return os.path.join(cache_dir, f"{key}.csv")
+
+
+def cache_get(cache_dir, key):
+    """The report stored under key, or None."""
+    path = _entry_path(cache_dir, key)
+    if not frame_exists(path):
+        return None
+
+    for fmt in ("parquet", "npz"):
+        if os.path.exists(binary_path(path, fmt)):
+            os.utime(binary_path(path, fmt))
+    return read_frame(path)
+
+
+def cache_put(cache_dir, key, df, max_mb, max_age_days):
+    """Stores df under key, then evicts by age and size."""
+    os.makedirs(cache_dir, exist_ok=True)
+    write_frame(df, _entry_path(cache_dir, key), export_csv=False)
+    evict(cache_dir, max_mb, max_age_days)
+
+
+def evict(cache_dir, max_mb, max_age_days):
+    """Removes entries unused for max_age_days, then the oldest until the total is at most max_mb."""
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    entries.sort()
+    cutoff = time.time() - max_age_days * 86400
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+
+    for mtime, size, path in entries:
+        if mtime >= cutoff and total <= max_mb * 1024 * 1024:
+            break
+        os.remove(path)
+        total -= size
+        removed += 1
+
+    if removed:
+        print(f"🧹 Revenue cache: {removed} old entries removed")
@@ -0,0 +1,130 @@
+import os
+import sys
+from datetime import datetime
+from calendar import monthrange
+
+from frames import read_frame, frame_exists
+from schemas import intern_keys
+from revenue_engine import ENGINE_VERSION, load_rules, load_reference, prepare_logins, build_revenue
+from revenue_state import state_key, update_revenue
+from result_cache import cache_key, cache_get, cache_put
+
+# Revenue report for the current month.
+#
+#     python revenue.py          # PRESET below
+#     python revenue.py z2       # another preset (x, y, z, z1, z2, z3)
+#
+# Presets and per-process rules: see revenue_engine.py and media/map/rules.csv.
+
+# ===== CONFIG =====
+PRESET = "z3"
+
+# Processes computed in parallel: 1 runs them serially in this process. A
+# pool only pays off for large map.csv/login sets; the rows are the same.
+WORKERS = 1
+
+# --- Step 1: Determine previous month ---
+today = datetime.today()
+first_day_current_month = today.replace(day=1)
+last_day_previous_month = first_day_current_month
+month_name = last_day_previous_month.strftime("%b").lower()
+year_full = last_day_previous_month.strftime("%Y")
+month_label = last_day_previous_month.strftime("%b")
+
+# Correct days in month
+year = last_day_previous_month.year
+month = last_day_previous_month.month
+_, days_in_month = monthrange(year, month)
+
+# --- Input paths ---
+map_path = r"D:\Revenue\media\map\map.csv"
+meta_path = r"D:\Revenue\media\map\meta.csv"
+cost_path = r"D:\Revenue\media\map\cost.csv"
+rules_path = r"D:\Revenue\media\map\rules.csv"
+
+# Per-month files, {tag} = <mon><yyyy> (e.g. oct2025)
+LOGIN_FILE = r"D:\Revenue\media\final_login\logins_{tag}.csv"
+OUTPUT_FILE = r"D:\Revenue\media\report\revenue_{tag}.csv"
+FAIL_FILE = r"D:\Revenue\media\fail_login\fail_logins_{tag}.csv"
+
+login_file = LOGIN_FILE.format(tag=f"{month_name}{year_full}")
+output_path = OUTPUT_FILE.format(tag=f"{month_name}{year_full}")
+fail_path = FAIL_FILE.format(tag=f"{month_name}{year_full}")
+
+# Per-day results kept between runs (see revenue_state.py); None disables them
+STATE_DIR = r"D:\Revenue\media\revenue_state\{tag}_{preset}"
+
+# Finished reports by input digest (see result_cache.py); None disables the cache
+CACHE_DIR = r"D:\Revenue\media\cache\revenue"
+CACHE_MAX_MB = 256
+CACHE_MAX_AGE_DAYS = 30
+
+
+def month_files(year, month):
+    """(login file, report, fail log) paths of any month."""
+    tag = datetime(year, month, 1).strftime("%b").lower() + str(year)
+    return LOGIN_FILE.format(tag=tag), OUTPUT_FILE.format(tag=tag), FAIL_FILE.format(tag=tag)
+
+
+def load_logins(path=login_file):
+    if not frame_exists(path):
+        raise FileNotFoundError(f"Login file not found: {path}")
+
+    return intern_keys(read_frame(path, categoricals=True), persist=False)
+
+
+def save_revenue(df_out, path=output_path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df_out.to_csv(path, index=False)
+
+    print(f"\n✅ Revenue report generated successfully at:\n{path}")
+
+
+def main(login_df=None, preset=PRESET, workers=WORKERS):
+    """Builds and saves the report. A login_df passed in (see pipeline.py) replaces reading the logins file."""
+    print(f"📅 Processing for month: {month_name} ({days_in_month} days), preset {preset}\n")
+
+    # --- Step 2: Read login data ---
+    if login_df is None:
+        login_df = load_logins()
+
+    # Same inputs as an earlier run → its report
+    if CACHE_DIR:
+        cache_id = cache_key(
+            [map_path, meta_path, cost_path, rules_path], login_df,
+            preset, year, month, days_in_month, ENGINE_VERSION
+        )
+        df_out = cache_get(CACHE_DIR, cache_id)
+        if df_out is not None:
+            print("♻️ Inputs unchanged → cached report")
+            save_revenue(df_out)
+            return df_out
+
+    login_df = prepare_logins(login_df, year, month, month_label, fail_path)
+
+    # --- Step 3: Read mapping, meta data and rules ---
+    rules = load_rules(rules_path, preset)
+    map_df, meta_df, cost_df = load_reference(map_path, meta_path, cost_path, preset, month_label)
+
+    # --- Steps 4–6: Revenue rows ---
+    def build(df, present=None, row_column=None):
+        return build_revenue(df, map_df, meta_df, cost_df, rules, preset, month_label, days_in_month,
+                             workers=workers, present=present, row_column=row_column)
+
+    if STATE_DIR:
+        key = state_key([map_path, meta_path, cost_path, rules_path], preset, days_in_month)
+        state_dir = STATE_DIR.format(tag=f"{month_name}{year_full}", preset=preset)
+        df_out = update_revenue(state_dir, login_df, build, key)
+    else:
+        df_out = build(login_df)
+
+    # --- Step 7: Save CSV ---
+    save_revenue(df_out)
+    if CACHE_DIR:
+        cache_put(CACHE_DIR, cache_id, df_out, CACHE_MAX_MB, CACHE_MAX_AGE_DAYS)
+    return df_out
+
+
+# Guard required: with WORKERS > 1 the worker processes (spawn on Windows) re-import this module
+if __name__ == "__main__":
+    main(preset=sys.argv[1] if len(sys.argv) > 1 else PRESET)
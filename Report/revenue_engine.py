@@ -0,0 +1,515 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from dates import parse_dates, format_dates
+from headcount import index_logins, daily_headcount, category_headcounts, capped, ceil_revenue, deficits
+from parallel import map_ordered
+from reference import index_meta, index_costs, cost_counts, cost_categories, empcode_categories
+
+# One revenue engine for every report variant.
+#
+# A preset picks the report family and the multi-cost mode:
+#
+#   flat      (x, y)      revenue includes ExtraBilling, Pay = cost, columns
+#                         in the x/y order; y averages '$' costs by headcount
+#   category  (z … z3)    '$' costs are billed per cost.csv Category, revenue
+#                         excludes ExtraBilling, Pay rounded, z column order
+#
+# Everything client specific (the UGVCL multiplier, single-cost uplifts,
+# no-login processes, mandays-priced processes, the days/mandays target) is
+# a row in media/map/rules.csv:
+#
+#     Process,Rule,Value,Presets
+#     UGVCL,cost_multiplier,1.075,z1 z2 z3
+#
+# The rows of the preset are compiled once into one vector per rule, aligned
+# with map.csv, so the process loop only reads numbers (a new client rule is
+# a new line in rules.csv, not a new script or branch).
+
+# Bump when a change alters the reports, so cached results (result_cache.py) are not reused
+ENGINE_VERSION = 1
+
+PRESETS = {
+    "x": {"family": "flat", "multi_cost": None},
+    "y": {"family": "flat", "multi_cost": "weighted"},
+    "z": {"family": "category", "multi_cost": "category"},
+    "z1": {"family": "category", "multi_cost": "category"},
+    "z2": {"family": "category", "multi_cost": "category"},
+    "z3": {"family": "category", "multi_cost": "category"},
+}
+
+# Rule → value for processes without that rule
+RULE_DEFAULTS = {
+    "cost_multiplier": 1.0,        # every cost and extra billing × value
+    "single_cost_uplift": 1.0,     # single cost × value for Pay and Target
+    "no_login": False,             # billed at FTE cap every day, logins not needed
+    "mandays_cost": False,         # single cost is per day → × Mandays
+    "target_formula": "standard",  # "days_ratio" → target × days in month / Mandays
+}
+
+TARGET_FORMULAS = {"standard": 0, "days_ratio": 1}
+
+FLAT_COLUMNS = [
+    "Date", "Process", "Location", "Cluster Head", "Pay", "Billable Minutes",
+    "Billable FTE cap", "Target Revenue", "Mandays", "Revenue", "Billable Revenue", "MTD", "Defecit",
+]
+CATEGORY_COLUMNS = [
+    "Date", "Process", "Location", "Cluster Head", "Pay", "Revenue", "Billable Minutes",
+    "Billable FTE cap", "Billable Revenue", "Mandays", "MTD", "Target Revenue", "Defecit",
+]
+
+
+# ===== RULE TABLE =====
+
+def load_rules(rules_file, preset):
+    """Rows of rules.csv that apply to preset (Process upper-cased)."""
+    if preset not in PRESETS:
+        raise ValueError(f"Unknown revenue preset '{preset}'. Choose from: {', '.join(PRESETS)}")
+
+    if not os.path.exists(rules_file):
+        print(f"⚠️ {rules_file} not found. No process rules applied.")
+        return pd.DataFrame(columns=["Process", "Rule", "Value"])
+
+    rules = pd.read_csv(rules_file, dtype=str).dropna(subset=["Process", "Rule"])
+    rules = rules.apply(lambda col: col.str.strip())
+
+    unknown = set(rules["Rule"]) - set(RULE_DEFAULTS)
+    if unknown:
+        raise ValueError(f"rules.csv: unknown rule(s) {sorted(unknown)}")
+
+    applies = rules["Presets"].fillna("").str.split().apply(lambda presets: preset in presets)
+    rules = rules[applies.to_numpy()]
+    return rules.assign(Process=rules["Process"].str.upper())[["Process", "Rule", "Value"]]
+
+
+def _rule_value(rule, value):
+    if isinstance(RULE_DEFAULTS[rule], bool):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    if rule == "target_formula":
+        if value not in TARGET_FORMULAS:
+            raise ValueError(f"rules.csv: unknown target_formula '{value}'")
+        return value
+    return float(value)
+
+
+def compile_rules(map_df, rules):
+    """One vector per rule, aligned with the map.csv rows (defaults where no rule matches)."""
+    process_upper = map_df["Process"].astype(str).str.strip().str.upper()
+
+    compiled = {}
+    for rule, default in RULE_DEFAULTS.items():
+        rows = rules[rules["Rule"] == rule]
+        lookup = {p: _rule_value(rule, v) for p, v in zip(rows["Process"], rows["Value"])}
+        compiled[rule] = [lookup.get(p, default) for p in process_upper]
+
+    compiled["target_formula"] = [TARGET_FORMULAS[f] for f in compiled["target_formula"]]
+    return compiled
+
+
+# ===== INPUTS =====
+
+def load_reference(map_path, meta_path, cost_path, preset, month_label=None):
+    """map.csv, meta.csv (only month_label's rows if given) and cost.csv (None unless the preset needs it)."""
+    multi_cost = PRESETS[preset]["multi_cost"]
+
+    map_df = pd.read_csv(map_path)
+    meta_df = pd.read_csv(meta_path)
+    cost_df = pd.read_csv(cost_path) if multi_cost else None
+
+    required_map_cols = {'Process', 'Location', 'Billable', 'Cost1', 'ExtraBilling'}
+    required_meta_cols = {'Process', 'Month', 'FTE Cap', 'Mandays'}
+    required_cost_cols = {'EmpCode', 'Process', 'Month', 'Cost'}
+    if multi_cost == "category":
+        required_cost_cols.add('Category')
+
+    if not required_map_cols.issubset(map_df.columns):
+        raise ValueError(f"map.csv must contain columns: {required_map_cols}")
+    if not required_meta_cols.issubset(meta_df.columns):
+        raise ValueError(f"meta.csv must contain columns: {required_meta_cols}")
+    if cost_df is not None and not required_cost_cols.issubset(cost_df.columns):
+        raise ValueError(f"cost.csv must contain columns: {required_cost_cols}")
+
+    # Normalize
+    if cost_df is not None:
+        if 'Category' in required_cost_cols:
+            cost_df['Category'] = cost_df['Category'].str.strip()
+        cost_df['Process'] = cost_df['Process'].str.strip()
+        cost_df['Month'] = cost_df['Month'].str.strip().str.lower()
+
+    meta_df['Process'] = meta_df['Process'].str.strip()
+
+    # Filter meta for this month
+    if month_label is not None:
+        meta_df = meta_df[meta_df['Month'].str.lower() == month_label.lower()]
+    return map_df, meta_df, cost_df
+
+
+def index_reference(meta_df, cost_df):
+    """Keyed meta/cost lookups for build_revenue; covers every month in the tables."""
+    return {"meta": index_meta(meta_df), "costs": index_costs(cost_df)}
+
+
+def prepare_logins(login_df, year, month, month_label, fail_path):
+    """Validated login rows of the processing month, Date as yyyy-mm-dd."""
+    required_login_cols = {'EmpCode', 'Date', 'Process', 'Minutes'}
+    if not required_login_cols.issubset(login_df.columns):
+        raise ValueError(f"logins file must contain columns: {required_login_cols}")
+
+    # Convert date mm-dd-yyyy → datetime
+    login_df = login_df.assign(Date=parse_dates(login_df['Date'], fmt='%m-%d-%Y'))
+
+    # --- Handle invalid dates (log & continue) ---
+    bad_dates = login_df[login_df['Date'].isna()]
+
+    if not bad_dates.empty:
+        os.makedirs(os.path.dirname(fail_path), exist_ok=True)
+
+        bad_dates.to_csv(fail_path, index=False)
+        print(f"⚠️ Invalid dates found. Logged to: {fail_path}")
+
+    # Remove invalid rows and continue
+    login_df = login_df[login_df['Date'].notna()]
+
+    # --- Restrict strictly to processing month ---
+    login_df = login_df[
+        (login_df['Date'].dt.month == month) &
+        (login_df['Date'].dt.year == year)
+    ]
+
+    if login_df.empty:
+        raise ValueError(
+            f"❌ No login data found for {month_label}-{year} after date filtering"
+        )
+
+    # ❌ Guard against epoch leakage
+    if (login_df['Date'] < pd.Timestamp('2000-01-01')).any():
+        raise ValueError("❌ Epoch / corrupted dates detected in login data")
+
+    # Normalize format AFTER validation
+    login_df['Date'] = format_dates(login_df['Date'], '%Y-%m-%d')
+
+    return login_df
+
+
+# ===== ENGINE =====
+
+def _extra_total(row, process, multiplier):
+    extra_list = []
+    raw_extra = row.get('ExtraBilling', '')
+
+    try:
+        if pd.notna(raw_extra) and str(raw_extra).strip() != "":
+            extra_list = json.loads(raw_extra)
+    except Exception as e:
+        print(f"⚠️ Invalid ExtraBilling format for {process}: {e}")
+
+    return sum(item.get("count", 0) * item.get("cost", 0) * multiplier for item in extra_list)
+
+
+def _single_cost_target(cost1, fte_cap, mandays, extra_total, rule, days_in_month):
+    """(effective cost, target) for a single-cost process."""
+    uplifted_cost = cost1 * rule["single_cost_uplift"]
+    effective_cost = uplifted_cost * mandays if rule["mandays_cost"] else uplifted_cost
+
+    if rule["target_formula"] == TARGET_FORMULAS["days_ratio"]:
+        target = (fte_cap * effective_cost * (days_in_month / mandays)) + extra_total
+    else:
+        target = (fte_cap * effective_cost) + extra_total
+    return effective_cost, target
+
+
+def _weighted_cost(ctx, process, allowed_costs):
+    costs, counts = cost_counts(ctx["costs"], process, ctx["month"], allowed_costs)
+
+    if not len(costs):
+        raise ValueError(
+            f"No matching cost data found in cost.csv for "
+            f"process={process}, month={ctx['month_label']}, costs={allowed_costs}"
+        )
+
+    # Weighted average cost
+    return (costs * counts).sum() / counts.sum()
+
+
+def _headcount(ctx, process, billable):
+    """daily_headcount(), memoized per (process, Billable) in ctx (see scenarios.py)."""
+    counts = ctx["headcounts"].get((process, billable))
+    if counts is None:
+        counts = daily_headcount(ctx["logins"], process, billable, len(ctx["date_list"]))
+        ctx["headcounts"][(process, billable)] = counts
+    return counts
+
+
+def _flat_process(ctx, row, rule, state):
+    """x/y: rows of one map.csv process, or None when it is skipped."""
+    process, billable = ctx["process"], ctx["billable"]
+    raw_cost1 = str(row['Cost1']).strip()
+    multiplier = rule["cost_multiplier"]
+
+    weighted = '$' in raw_cost1 and ctx["multi_cost"] == "weighted"
+    if weighted:
+        allowed_costs = [float(c) * multiplier for c in raw_cost1.split('$')]
+        cost1 = _weighted_cost(ctx, process, allowed_costs)
+    else:
+        cost1 = float(raw_cost1) * multiplier
+
+    extra_total = _extra_total(row, process, multiplier)
+
+    meta = ctx["meta"].get((process, ctx["month"]))
+    if meta is None:
+        print(f"⚠️ No metadata found for process '{process}' for month {ctx['month_label']}.")
+        return None
+
+    fte_cap, mandays = meta
+
+    if weighted:
+        pay, target = cost1, (fte_cap * cost1) + extra_total
+    else:
+        pay, target = _single_cost_target(cost1, fte_cap, mandays, extra_total, rule, ctx["days_in_month"])
+
+    n_dates = len(ctx["date_list"])
+    if rule["no_login"]:
+        empcount = np.full(n_dates, round(fte_cap, 2))
+    elif process not in ctx["present"]:
+        print(f"⚠️ No login data found for process '{process}'.")
+        return None
+    else:
+        empcount = _headcount(ctx, process, billable)
+
+    revenue = ceil_revenue(empcount, cost1, mandays, extra_total, when=empcount > 0)
+    billable_count = capped(empcount, fte_cap)
+    billable_revenue = ceil_revenue(billable_count, cost1, mandays, extra_total, when=billable_count > 0)
+
+    daily_target = target / ctx["days_in_month"]
+    if daily_target > 0:
+        deficit = deficits(daily_target, revenue.tolist())
+    else:
+        deficit = [0] * n_dates
+
+    return {
+        "Pay": pay, "Billable Minutes": billable, "Billable FTE cap": fte_cap,
+        "Target Revenue": target, "Mandays": mandays,
+        "Revenue": revenue, "Billable Revenue": billable_revenue, "Defecit": deficit,
+    }
+
+
+def _category_process(ctx, row, rule, state):
+    """z…z3: rows of one map.csv process, or None when it is skipped."""
+    process, billable = ctx["process"], ctx["billable"]
+    meta_index, month = ctx["meta"], ctx["month"]
+    raw_cost1 = str(row['Cost1']).strip()
+    multiplier = rule["cost_multiplier"]
+    n_dates = len(ctx["date_list"])
+
+    extra_total = _extra_total(row, process, multiplier)
+
+    # --- MULTI COST MODE: billed per cost.csv Category ---
+    if '$' in raw_cost1:
+        allowed_costs = [float(c) * multiplier for c in raw_cost1.split('$')]
+
+        category_map = {}
+        for cat, (cost, empcodes) in cost_categories(ctx["costs"], process, month, allowed_costs).items():
+            category_map[cat] = {"cost": cost * multiplier, "empcodes": empcodes}
+
+        # Display-only values
+        if len(category_map):
+            pay = sum(info['cost'] for info in category_map.values()) / len(category_map)
+        else:
+            pay = 0
+        fte_display = 0
+
+        target = extra_total
+        for cat, info in category_map.items():
+            meta = meta_index.get((cat, month))
+            if meta is not None:
+                fte_cap_cat = meta[0]
+                fte_display += fte_cap_cat
+                target += fte_cap_cat * info['cost']
+
+        if process not in ctx["present"]:
+            return None
+
+        revenue = np.zeros(n_dates, dtype=np.int64)
+        billable_revenue = np.zeros(n_dates, dtype=np.int64)
+
+        # Headcount of every category at once, via the EmpCode → category index
+        key = (process, billable, tuple(allowed_costs))
+        counts = ctx["headcounts"].get(key)
+        if counts is None:
+            categories_of = empcode_categories(info['empcodes'] for info in category_map.values())
+            counts = category_headcounts(ctx["logins"], process, billable, n_dates, categories_of, len(category_map))
+            ctx["headcounts"][key] = counts
+
+        for empcount, (cat, info) in zip(counts, category_map.items()):
+            meta = meta_index.get((cat, month))
+            if meta is None:
+                continue
+
+            # Reported Mandays: the last category's, else the previous process's
+            fte_cap_cat, state["mandays"] = meta
+            billable_count = capped(empcount, fte_cap_cat)
+
+            revenue += ceil_revenue(empcount, info['cost'], state["mandays"])
+            billable_revenue += ceil_revenue(billable_count, info['cost'], state["mandays"])
+
+    # --- SINGLE COST MODE ---
+    else:
+        cost1 = float(raw_cost1) * multiplier
+
+        meta = meta_index.get((process, month))
+        if meta is None:
+            return None
+        fte_cap, state["mandays"] = meta
+
+        pay, target = _single_cost_target(cost1, fte_cap, state["mandays"], extra_total, rule, ctx["days_in_month"])
+        fte_display = fte_cap
+
+        if rule["no_login"]:
+            empcount = np.full(n_dates, round(fte_cap, 2))
+        elif process not in ctx["present"]:
+            return None
+        else:
+            empcount = _headcount(ctx, process, billable)
+
+        revenue = ceil_revenue(empcount, cost1, state["mandays"])
+        billable_revenue = ceil_revenue(capped(empcount, fte_cap), cost1, state["mandays"], when=empcount != 0)
+
+    return {
+        "Pay": round(pay, 2), "Revenue": revenue, "Billable Minutes": billable,
+        "Billable FTE cap": fte_display, "Billable Revenue": billable_revenue,
+        "Mandays": state.get("mandays"), "Target Revenue": target,
+        "Defecit": deficits(target / ctx["days_in_month"], revenue.tolist()),
+    }
+
+
+def run_processes(ctx, family, items):
+    """Values of each (row, rule) item, each process run with a fresh state.
+
+    Also returns the Mandays each process leaves behind (None if it set
+    none), which build_revenue carries into the following processes. Top
+    level so it can run in a worker process.
+    """
+    process_rows = _flat_process if family == "flat" else _category_process
+    results = []
+    for row, rule in items:
+        ctx["process"] = str(row['Process']).strip()
+        ctx["billable"] = float(row['Billable'])
+        state = {}
+        results.append((process_rows(ctx, row, rule, state), state.get("mandays")))
+    return results
+
+
+def _chunks(n_items, n_chunks):
+    """Contiguous (start, stop) ranges splitting n_items into at most n_chunks parts."""
+    bounds = np.linspace(0, n_items, min(n_chunks, n_items) + 1).astype(int)
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def build_context(login_df, map_df, indexes, rules, preset, month_label, days_in_month, present=None):
+    """Inputs of the process loop: ctx and one (map.csv row, rule) item per process."""
+    # --- Unique dates ---
+    date_list = sorted(login_df['Date'].dropna().unique())
+
+    logins = index_logins(login_df, date_list)
+    ctx = {
+        "date_list": date_list,
+        "logins": logins,
+        "present": set(logins) if present is None else set(present),
+        "headcounts": {},
+        "meta": indexes["meta"],
+        "costs": indexes["costs"],
+        "month": month_label.lower(),
+        "month_label": month_label,
+        "days_in_month": days_in_month,
+        "multi_cost": PRESETS[preset]["multi_cost"],
+    }
+    compiled = compile_rules(map_df, rules)
+
+    # Plain dicts: cheaper to read (and copy, in scenarios.py) than iterrows() Series
+    items = [
+        (row, {name: values[i] for name, values in compiled.items()})
+        for i, row in enumerate(map_df.to_dict("records"))
+    ]
+    return ctx, items
+
+
+def build_revenue(login_df, map_df, meta_df, cost_df, rules, preset, month_label, days_in_month,
+                  indexes=None, workers=1, present=None, row_column=None):
+    """Daily revenue rows per map.csv process for the given preset.
+
+    indexes (from index_reference) replaces meta_df/cost_df when several
+    months share one load of the reference tables. workers > 1 spreads the
+    processes over a pool (see the process loop); the rows are the same.
+
+    For a run over some days only (revenue_state.py): present is the set of
+    processes with logins in the whole month, which decides the processes
+    reported, and row_column names an extra column holding each row's
+    map.csv position.
+    """
+    if indexes is None:
+        indexes = index_reference(meta_df, cost_df)
+
+    family = PRESETS[preset]["family"]
+    columns = FLAT_COLUMNS if family == "flat" else CATEGORY_COLUMNS
+
+    ctx, items = build_context(login_df, map_df, indexes, rules, preset, month_label, days_in_month, present)
+    map_rows = [row for row, _ in items]
+
+    # Report labels (dd-mm-yyyy) computed once per date, not per output row
+    display_labels = format_dates(parse_dates(ctx["date_list"], fmt='%Y-%m-%d'), '%d-%m-%Y').tolist()
+
+    # --- Process loop ---
+    # Processes only share the reported Mandays of the category family (a
+    # process that sets none shows the previous one's), so they run
+    # independently and that value is carried over below, in map.csv order.
+    # In parallel, each worker gets a contiguous block of map.csv rows and
+    # only the login partitions of its processes.
+    if workers > 1 and len(items) > 1:
+        tasks = []
+        for start, stop in _chunks(len(items), workers * 2):
+            names = {str(row['Process']).strip() for row, _ in items[start:stop]}
+            chunk_ctx = dict(ctx, logins={p: v for p, v in ctx["logins"].items() if p in names},
+                             present=ctx["present"] & names)
+            tasks.append((chunk_ctx, family, items[start:stop]))
+
+        results = []
+        for _, chunk, error in map_ordered(run_processes, tasks, workers):
+            if error is not None:
+                raise error
+            results.extend(chunk)
+    else:
+        results = run_processes(ctx, family, items)
+
+    rows = []
+    mandays = None
+
+    for position, (row, (values, set_mandays)) in enumerate(zip(map_rows, results)):
+        if set_mandays is not None:
+            mandays = set_mandays
+        if values is None:
+            continue
+        if values["Mandays"] is None:
+            values["Mandays"] = mandays
+
+        values["MTD"] = np.cumsum(values["Billable Revenue"])
+        values["Process"] = str(row['Process']).strip()
+        values["Location"] = row['Location']
+        values["Cluster Head"] = row['Cluster Head']
+
+        for d, label in enumerate(display_labels):
+            out = {"Date": label}
+            for col in columns[1:]:
+                value = values[col]
+                if isinstance(value, np.ndarray):
+                    value = int(value[d])
+                elif isinstance(value, list):
+                    value = value[d]
+                out[col] = value
+            if row_column is not None:
+                out[row_column] = position
+            rows.append(out)
+
+    # --- Output DF ---
+    return pd.DataFrame(rows)
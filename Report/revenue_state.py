@@ -0,0 +1,91 @@
+import os
+import hashlib
+
+import pandas as pd
+
+from frames import write_frame, read_frame, frame_exists
+from manifest import load_manifest, save_manifest
+from dates import parse_dates, format_dates
+from login_store import config_key, day_digests
+
+# Persisted revenue results of the month, so a daily run only computes the
+# new day(s):
+#
+#     revenue_state/<mon><yyyy>_<preset>/rows.<parquet|npz>
+#     revenue_state/<mon><yyyy>_<preset>/meta.json
+#
+# rows holds the last report, one row per process and day, with the map.csv
+# position of each row. meta.json keeps a digest of every login day, the
+# processes with logins in the month and a key for the reference files.
+#
+# Every day's Revenue / Billable Revenue / Defecit depends only on that
+# day's logins, so a run recomputes from the earliest day whose logins
+# changed (new days, or late data for an earlier one), keeps the stored rows
+# before it and rebuilds the MTD running totals. A different key or process
+# set means a full recomputation.
+
+STATE_VERSION = 1
+META_FILE = "meta.json"
+ROWS_FILE = "rows.csv"
+MAP_ROW = "_map_row"
+LOGIN_DATE_FORMAT = "%Y-%m-%d"      # prepare_logins() output
+REPORT_DATE_FORMAT = "%d-%m-%Y"
+
+
+def state_key(paths, preset, days_in_month):
+    """Digest of the reference files, preset and month length the rows depend on."""
+    h = hashlib.sha1(f"{STATE_VERSION}:{config_key(paths)}:{preset}:{days_in_month}".encode())
+    return h.hexdigest()
+
+
+def _report_days(dates):
+    return format_dates(parse_dates(dates, fmt=REPORT_DATE_FORMAT), LOGIN_DATE_FORMAT)
+
+
+def update_revenue(state_dir, login_df, build, key):
+    """Report of the month, recomputing only from the earliest changed day.
+
+    login_df is the prepared month (Date yyyy-mm-dd). build(login_df,
+    present, row_column) is build_revenue() for those rows; the result
+    equals a build of the whole month.
+    """
+    meta_path = os.path.join(state_dir, META_FILE)
+    rows_path = os.path.join(state_dir, ROWS_FILE)
+    meta = load_manifest(meta_path)
+
+    digests = day_digests([login_df], LOGIN_DATE_FORMAT)
+    present = sorted({str(p).strip() for p in login_df["Process"].dropna().unique()})
+
+    reusable = (
+        meta.get("config") == key and meta.get("processes") == present and frame_exists(rows_path)
+    )
+    stored = meta.get("days", {}) if reusable else {}
+    changed = sorted(day for day in set(digests) | set(stored) if stored.get(day) != digests.get(day))
+
+    if reusable and not changed:
+        print(f"📆 Revenue days: all {len(digests)} reused")
+        return read_frame(rows_path).drop(columns=MAP_ROW)
+
+    if not reusable:
+        print(f"📆 Revenue days: {len(digests)} computed (no usable state)")
+        result = build(login_df, set(present), MAP_ROW)
+    else:
+        since = changed[0]
+        previous = read_frame(rows_path)
+        kept = previous[(_report_days(previous["Date"]) < since).to_numpy()]
+
+        recompute = login_df[(login_df["Date"] >= since).to_numpy()]
+        print(f"📆 Revenue days: from {since} recomputed, {kept['Date'].nunique()} reused")
+
+        frames = [kept]
+        if not recompute.empty:
+            frames.append(build(recompute, set(present), MAP_ROW))
+
+        # Stored days first, then the recomputed ones, per map.csv process
+        result = pd.concat(frames, ignore_index=True)
+        result = result.sort_values(MAP_ROW, kind="mergesort").reset_index(drop=True)
+        result["MTD"] = result.groupby(MAP_ROW)["Billable Revenue"].cumsum()
+
+    write_frame(result, rows_path, export_csv=False)
+    save_manifest({"config": key, "processes": present, "days": digests}, meta_path)
+    return result.drop(columns=MAP_ROW)
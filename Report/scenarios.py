@@ -0,0 +1,182 @@
+import os
+import sys
+import itertools
+
+import pandas as pd
+
+from headcount import headcount_grid
+from revenue_engine import PRESETS, load_rules, load_reference, index_reference, prepare_logins, build_context, run_processes
+import revenue
+
+# What-if revenue for the current month: "Billable 450 instead of 480",
+# "FTE Cap of Bajaj_Allianz-L1 at 20", ... without editing map.csv/meta.csv.
+#
+#     python scenarios.py          # PRESET and SCENARIO_FILE below
+#     python scenarios.py z2
+#
+# SCENARIO_FILE lists the overrides:
+#
+#     Scenario,Field,Process,Values
+#     billable_450,Billable,*,450
+#     bajaj_cap,FTE Cap,Bajaj_Allianz-L1,18 20 22
+#     bajaj_cap,Billable,Bajaj_Allianz-Noida,450 480
+#
+# Field is a map.csv column (Billable, Cost1) or a meta.csv one (FTE Cap,
+# Mandays); Process "*" means every process. Rows of one Scenario apply
+# together, and space-separated Values expand into a grid (the bajaj_cap
+# lines above are 3 × 2 = 6 scenarios).
+#
+# The logins, reference indexes and rules are prepared once. The headcounts
+# of every Billable value a process takes in any scenario are computed in
+# one broadcast pass over its login minutes, so each scenario only redoes
+# the cheap per-process revenue math. The output has one row per scenario
+# and process with the month's totals; scenario "base" is the unchanged
+# report.
+
+# ===== CONFIG =====
+PRESET = revenue.PRESET
+SCENARIO_FILE = r"D:\Revenue\media\map\scenarios.csv"
+OUTPUT_FILE = r"D:\Revenue\media\scenarios\scenarios_{tag}_{preset}.csv"
+
+MAP_FIELDS = {"Billable", "Cost1"}
+META_FIELDS = {"FTE Cap", "Mandays"}
+ALL = "*"
+
+SUMMARY_COLUMNS = [
+    "Scenario", "Process", "Location", "Pay", "Billable Minutes", "Billable FTE cap",
+    "Target Revenue", "Revenue", "Billable Revenue",
+]
+
+
+# ===== SCENARIOS =====
+
+def grid(name, axes):
+    """Scenarios for every combination of axes [(field, process, [values])], as [(name, overrides)]."""
+    for field, _, _ in axes:
+        if field not in MAP_FIELDS | META_FIELDS:
+            raise ValueError(f"Unknown scenario field '{field}'. Choose from: {', '.join(sorted(MAP_FIELDS | META_FIELDS))}")
+
+    varying = [i for i, (_, _, values) in enumerate(axes) if len(values) > 1]
+    scenarios = []
+    for combo in itertools.product(*(values for _, _, values in axes)):
+        overrides = [(field, process, value) for (field, process, _), value in zip(axes, combo)]
+        label = ", ".join(f"{axes[i][0]} {axes[i][1]}={combo[i]}" for i in varying)
+        scenarios.append((f"{name} [{label}]" if label else name, overrides))
+    return scenarios
+
+
+def load_scenarios(path):
+    """Scenario file → [(name, overrides)], in file order."""
+    df = pd.read_csv(path, dtype=str).dropna(subset=["Scenario", "Field", "Process", "Values"])
+    df = df.apply(lambda col: col.str.strip())
+
+    scenarios = []
+    for name, rows in df.groupby("Scenario", sort=False):
+        axes = [(field, process, values.split()) for field, process, values in
+                zip(rows["Field"], rows["Process"], rows["Values"])]
+        scenarios.extend(grid(name, axes))
+    return scenarios
+
+
+def _apply(items, meta, month, overrides):
+    """(items, meta index) with a scenario's overrides applied; the inputs are not changed."""
+    items = list(items)
+    meta = dict(meta)
+
+    for field, process, value in overrides:
+        matched = False
+
+        if field in MAP_FIELDS:
+            for i, (row, rule) in enumerate(items):
+                if process == ALL or str(row['Process']).strip() == process:
+                    row = dict(row)
+                    row[field] = float(value) if field == "Billable" else value
+                    items[i] = (row, rule)
+                    matched = True
+        else:
+            for key, (fte_cap, mandays) in meta.items():
+                if key[1] == month and (process == ALL or key[0] == process):
+                    meta[key] = (float(value), mandays) if field == "FTE Cap" else (fte_cap, float(value))
+                    matched = True
+
+        if not matched:
+            print(f"⚠️ Scenario override {field} for '{process}' matches no process")
+
+    return items, meta
+
+
+def _seed_headcounts(ctx, runs):
+    """Fills ctx's headcount memo for every (process, Billable) pair in runs, one broadcast per process."""
+    thresholds = {}
+    for items, _ in runs:
+        for row, _ in items:
+            process = str(row['Process']).strip()
+            if process in ctx["logins"]:
+                thresholds.setdefault(process, set()).add(float(row['Billable']))
+
+    n_dates = len(ctx["date_list"])
+    for process, values in thresholds.items():
+        values = sorted(values)
+        for billable, counts in zip(values, headcount_grid(ctx["logins"], process, values, n_dates)):
+            ctx["headcounts"][(process, billable)] = counts
+
+
+def evaluate(ctx, items, family, scenarios):
+    """Month totals per scenario and process (base first) for a prepared build_context()."""
+    runs = [_apply(items, ctx["meta"], ctx["month"], overrides) for _, overrides in scenarios]
+    names = [name for name, _ in scenarios]
+
+    runs.insert(0, (items, ctx["meta"]))
+    names.insert(0, "base")
+
+    _seed_headcounts(ctx, runs)
+
+    rows = []
+    for name, (run_items, run_meta) in zip(names, runs):
+        try:
+            results = run_processes(dict(ctx, meta=run_meta), family, run_items)
+        except Exception as e:
+            print(f"❌ Error in scenario '{name}': {e}")
+            continue
+
+        for (row, _), (values, _) in zip(run_items, results):
+            if values is None:
+                continue
+            rows.append({
+                "Scenario": name, "Process": str(row['Process']).strip(), "Location": row['Location'],
+                "Pay": values["Pay"], "Billable Minutes": values["Billable Minutes"],
+                "Billable FTE cap": values["Billable FTE cap"], "Target Revenue": values["Target Revenue"],
+                "Revenue": int(values["Revenue"].sum()), "Billable Revenue": int(values["Billable Revenue"].sum()),
+            })
+
+    return pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+
+
+def main(login_df=None, preset=PRESET, scenario_file=SCENARIO_FILE):
+    """Evaluates the scenario file on this month's logins and saves the totals."""
+    scenarios = load_scenarios(scenario_file)
+    print(f"🧪 {len(scenarios)} scenarios for {revenue.month_name} ({revenue.days_in_month} days), preset {preset}\n")
+
+    rules = load_rules(revenue.rules_path, preset)
+    map_df, meta_df, cost_df = load_reference(
+        revenue.map_path, revenue.meta_path, revenue.cost_path, preset, revenue.month_label
+    )
+
+    if login_df is None:
+        login_df = revenue.load_logins()
+    login_df = prepare_logins(login_df, revenue.year, revenue.month, revenue.month_label, revenue.fail_path)
+
+    ctx, items = build_context(
+        login_df, map_df, index_reference(meta_df, cost_df), rules, preset, revenue.month_label, revenue.days_in_month
+    )
+    df_out = evaluate(ctx, items, PRESETS[preset]["family"], scenarios)
+
+    output_path = OUTPUT_FILE.format(tag=f"{revenue.month_name}{revenue.year_full}", preset=preset)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    df_out.to_csv(output_path, index=False)
+    print(f"✅ Scenario totals saved at:\n{output_path}")
+    return df_out
+
+
+if __name__ == "__main__":
+    main(preset=sys.argv[1] if len(sys.argv) > 1 else PRESET)
@@ -0,0 +1,198 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from dedup import ROW_FINGERPRINT, line_fingerprints
+
+# Per-source read schemas: which columns survive to final.py and the compact
+# dtype each one is parsed into. Everything else in the export is skipped by
+# the CSV parser, so parse time and memory follow the columns we use. The
+# whole row is only seen as a hash of its raw line (dedup.line_fingerprints).
+#
+#   "columns"  → column name → dtype ("category", "minutes")
+#   "required" → columns a file must have to be usable
+#   "version"  → bump when the schema changes (invalidates stored parts)
+
+DIALER_SCHEMA = {
+    "version": 4,
+    "columns": {"EmpCode": "category", "Date": "category", "Minutes": "minutes"},
+    "required": ["EmpCode", "Date", "Minutes"],
+}
+
+DOWNTIME_SCHEMA = {
+    "version": 4,
+    "columns": {"EmpCode": "category", "Date": "str", "Minutes": "minutes",
+                "my_process": "category", "Process": "category"},
+    "required": ["EmpCode", "Date", "Minutes"],
+}
+
+
+class SchemaError(ValueError):
+    """A source file does not have the columns its schema requires."""
+
+
+# Files bigger than this are streamed in chunks of CHUNK_ROWS rows
+LARGE_FILE_BYTES = 200 * 1024 * 1024
+CHUNK_ROWS = 500_000
+
+
+def _csv_dtypes(schema):
+    # Parse-time dtypes; minutes are parsed as numbers and narrowed afterwards
+    return {col: ("category" if kind == "category" else str)
+            for col, kind in schema["columns"].items() if kind != "minutes"}
+
+
+def narrow_minutes(series):
+    """int32 when every value is a whole number, otherwise left as float."""
+    values = pd.to_numeric(series, errors="coerce")
+    if values.notna().all() and (values % 1 == 0).all():
+        return values.astype(np.int32)
+    return values
+
+
+def _apply_schema(df, schema, file_path):
+    df.columns = df.columns.str.strip()
+
+    missing = [c for c in schema["required"] if c not in df.columns]
+    if missing:
+        raise SchemaError(f"missing columns {missing} in {file_path}")
+
+    for col, kind in schema["columns"].items():
+        if col not in df.columns:
+            continue
+        if kind == "minutes":
+            df[col] = narrow_minutes(df[col])
+        elif kind == "category" and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+
+    return df
+
+
+def concat_categoricals(frames):
+    """pd.concat that keeps categorical columns categorical (union of categories)."""
+    frames = [f for f in frames if f is not None]
+    if not frames:
+        return pd.DataFrame()
+
+    cat_cols = [c for c in frames[0].columns
+                if all(c in f.columns and isinstance(f[c].dtype, pd.CategoricalDtype) for f in frames)]
+
+    if cat_cols:
+        for col in cat_cols:
+            union = pd.api.types.union_categoricals([f[col] for f in frames]).categories
+            for f in frames:
+                f[col] = f[col].cat.set_categories(union)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_csv_with_schema(file_path, schema, fingerprint=False):
+    """Reads only the schema's columns from a CSV, streaming big files in chunks.
+
+    fingerprint=True adds ROW_FINGERPRINT, the hash of each row's whole line.
+    """
+    wanted = set(schema["columns"])
+    reader_kwargs = {
+        "usecols": lambda c: c.strip() in wanted,
+        "dtype": {c: t for c, t in _csv_dtypes(schema).items()},
+    }
+
+    if os.path.getsize(file_path) <= LARGE_FILE_BYTES:
+        df = _apply_schema(pd.read_csv(file_path, **reader_kwargs), schema, file_path)
+    else:
+        chunks = [
+            _apply_schema(chunk, schema, file_path)
+            for chunk in pd.read_csv(file_path, chunksize=CHUNK_ROWS, **reader_kwargs)
+        ]
+        df = concat_categoricals(chunks)
+
+    if fingerprint:
+        df[ROW_FINGERPRINT] = line_fingerprints(file_path, len(df))
+    return df
+
+
+# ===== PIPELINE-WIDE KEY DICTIONARIES =====
+# EmpCode / Process / Source / Date are carried between stages as integer-
+# coded categoricals. Their categories come from shared, append-only
+# dictionaries (one JSON list per column), so a value keeps the same code in
+# combine.py, final.py and the revenue scripts. Values are interned exactly
+# as they are ("ATS1 " and "ATS1" stay two keys, as in the plain-string
+# merge and groupby); later stages compare codes, not strings.
+
+# Defined only here: every stage must intern against the same dictionaries
+DICTIONARY_DIR = r"D:\Revenue\media\state\dictionaries"
+# column → dictionary it is interned against
+KEY_COLUMNS = {
+    "EmpCode": "EmpCode",
+    "Process": "Process",
+    "my_process": "Process",
+    "Source": "Source",
+    "Date": "Date",
+}
+
+_DICTIONARIES = {}
+
+
+def load_dictionary(column, dict_dir=DICTIONARY_DIR):
+    if (dict_dir, column) not in _DICTIONARIES:
+        path = os.path.join(dict_dir, f"{column}.json")
+        values = []
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                values = json.load(f)
+        _DICTIONARIES[(dict_dir, column)] = pd.Index(values, dtype=object)
+    return _DICTIONARIES[(dict_dir, column)]
+
+
+def _save_dictionary(column, values, dict_dir):
+    os.makedirs(dict_dir, exist_ok=True)
+    path = os.path.join(dict_dir, f"{column}.json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(list(values), f)
+    os.replace(tmp_path, path)
+
+
+def intern_column(series, column, dict_dir=DICTIONARY_DIR, persist=True):
+    """Categorical with the shared dictionary as categories (new values appended).
+
+    persist=False extends the dictionary for this process only (readers).
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques = series.cat.categories.to_numpy(dtype=object)
+    else:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        uniques = np.asarray(uniques, dtype=object)
+
+    labels = np.array([v if isinstance(v, str) else str(v) for v in uniques], dtype=object)
+
+    dictionary = load_dictionary(column, dict_dir)
+    new_values = pd.Index(labels).unique().difference(dictionary, sort=False)
+    if len(new_values):
+        dictionary = dictionary.append(new_values)
+        _DICTIONARIES[(dict_dir, column)] = dictionary
+        if persist:
+            _save_dictionary(column, dictionary, dict_dir)
+
+    code_map = dictionary.get_indexer(labels)
+    new_codes = np.where(codes >= 0, code_map[codes] if len(code_map) else -1, -1)
+    return pd.Series(
+        pd.Categorical.from_codes(new_codes, categories=dictionary),
+        index=series.index, name=series.name
+    )
+
+
+def intern_keys(df, dict_dir=DICTIONARY_DIR, persist=True):
+    """Interns every key column present in df (in place); returns df."""
+    for column, dictionary in KEY_COLUMNS.items():
+        if column in df.columns:
+            df[column] = intern_column(df[column], dictionary, dict_dir, persist)
+    return df
+
+
+def sort_by_labels(df, columns):
+    """Sorts rows by the string value of the given columns (not category codes)."""
+    order = np.lexsort([df[c].astype(object).astype(str).to_numpy() for c in reversed(columns)])
+    return df.iloc[order].reset_index(drop=True)
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+from frames import frame_exists, iter_frame
+from schemas import intern_keys, load_dictionary
+
+# Bounded-memory variant of final.py's read → concat → downtime merge.
+#
+# The sources are read in chunks. Each chunk is reduced right away to
+# per-key partials on the interned integer codes of (EmpCode, Date, Process):
+# minutes sum, row count and non-null minutes count. The partials are kept
+# in a buffer that is compacted (re-grouped) whenever it grows past the
+# memory ceiling, so memory is bounded by the number of distinct keys rather
+# than the number of login rows.
+#
+# The result matches apply_downtime() followed by a groupby sum. Every
+# login row of a key got that key's total downtime added (NaN minutes stay
+# NaN), and downtime with no login row is kept as its own row.
+
+KEYS = ["EmpCode", "Date", "Process"]
+STREAM_COLUMNS = KEYS + ["Minutes", "my_process"]
+
+
+def _key_codes(chunk, dict_dir):
+    chunk = chunk.rename(columns=lambda c: c.strip())
+    if "my_process" in chunk.columns:
+        chunk = chunk.drop(columns=[c for c in ["Process"] if c in chunk.columns])
+        chunk = chunk.rename(columns={"my_process": "Process"})
+    intern_keys(chunk, dict_dir)
+
+    codes = pd.DataFrame({key: chunk[key].cat.codes.to_numpy() for key in KEYS})
+    codes["Minutes"] = chunk["Minutes"].to_numpy()
+
+    # Rows with a missing key never reach the final groupby
+    return codes[(codes[KEYS] >= 0).all(axis=1).to_numpy()]
+
+
+def _reduce(frames, aggregations):
+    combined = pd.concat(frames, ignore_index=True)
+    return combined.groupby(KEYS, sort=False).agg(**aggregations).reset_index()
+
+
+class _PartialBuffer:
+    """Per-key partials, compacted whenever their size passes max_bytes."""
+
+    def __init__(self, aggregations, compact, max_bytes):
+        self.aggregations = aggregations
+        self.compact = compact
+        self.max_bytes = max_bytes
+        self.frames = []
+        self.bytes = 0
+        self.dtype = None
+
+    def add(self, codes):
+        self.dtype = codes["Minutes"].dtype if self.dtype is None else np.result_type(self.dtype, codes["Minutes"].dtype)
+        partial = _reduce([codes], self.aggregations)
+        self.frames.append(partial)
+        self.bytes += int(partial.memory_usage(index=False).sum())
+
+        if self.bytes > self.max_bytes and len(self.frames) > 1:
+            merged = _reduce(self.frames, self.compact)
+            self.frames = [merged]
+            self.bytes = int(merged.memory_usage(index=False).sum())
+
+    def result(self):
+        if not self.frames:
+            return None
+        return _reduce(self.frames, self.compact)
+
+
+def _stream_partials(paths, chunk_rows, max_bytes, dict_dir, aggregations, compact):
+    buffer = _PartialBuffer(aggregations, compact, max_bytes)
+
+    for path in paths:
+        if not frame_exists(path):
+            print(f"⚠️ Source missing: {path}")
+            continue
+
+        print(f"📁 Streaming source: {path}")
+        for chunk in iter_frame(path, chunk_rows, columns=STREAM_COLUMNS):
+            buffer.add(_key_codes(chunk, dict_dir))
+
+    return buffer.result(), buffer.dtype
+
+
+def stream_logins(source_paths, downtime_path, dict_dir, chunk_rows, memory_mb):
+    """One row per (EmpCode, Date, Process) with login minutes plus downtime.
+
+    memory_mb bounds the buffered partials of each input.
+    """
+    max_bytes = memory_mb * 1024 * 1024
+
+    logins, login_dtype = _stream_partials(
+        source_paths, chunk_rows, max_bytes, dict_dir,
+        aggregations={"_sum": ("Minutes", "sum"), "_rows": ("Minutes", "size"), "_valid": ("Minutes", "count")},
+        compact={"_sum": ("_sum", "sum"), "_rows": ("_rows", "sum"), "_valid": ("_valid", "sum")},
+    )
+    if logins is None:
+        raise FileNotFoundError("❌ No main source files available. Cannot continue.")
+
+    downtime, downtime_dtype = _stream_partials(
+        [downtime_path], chunk_rows, max_bytes, dict_dir,
+        aggregations={"_downtime": ("Minutes", "sum")},
+        compact={"_downtime": ("_downtime", "sum")},
+    )
+
+    if downtime is None:
+        merged = logins.assign(_downtime=np.nan)
+        out_dtype = login_dtype
+    else:
+        merged = logins.merge(downtime, on=KEYS, how="outer", sort=False)
+        out_dtype = np.result_type(login_dtype, downtime_dtype)
+
+    has_login = merged["_rows"].notna().to_numpy()
+    downtime_minutes = merged["_downtime"].fillna(0).to_numpy()
+    login_total = merged["_sum"].fillna(0).to_numpy() + merged["_valid"].fillna(0).to_numpy() * downtime_minutes
+    minutes = np.where(has_login, login_total, downtime_minutes)
+
+    # Without any downtime on a login key the minutes keep the login dtype
+    if downtime is None or not (merged["_downtime"].notna().to_numpy()).any():
+        out_dtype = login_dtype
+
+    result = pd.DataFrame({
+        key: pd.Categorical.from_codes(merged[key].to_numpy(), categories=load_dictionary(key, dict_dir))
+        for key in KEYS
+    })
+    result["Minutes"] = minutes.astype(out_dtype)
+    return result
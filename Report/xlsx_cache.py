@@ -0,0 +1,58 @@
+import os
+import glob
+import hashlib
+import pandas as pd
+
+# Convert-once cache for Excel inputs. The parsed sheet is pickled under a
+# name built from the workbook path plus its size and mtime:
+#
+#     <sha1(path)[:16]>_<size>_<mtime_ns>.pkl
+#
+# so a lookup is a single exists() check, a changed workbook simply misses,
+# and no shared index has to be written by parallel workers.
+
+
+def _path_key(file_path):
+    return hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:16]
+
+
+def cache_path_for(cache_dir, file_path):
+    stat = os.stat(file_path)
+    return os.path.join(cache_dir, f"{_path_key(file_path)}_{stat.st_size}_{stat.st_mtime_ns}.pkl")
+
+
+def read_excel_cached(file_path, cache_dir):
+    """pd.read_excel(file_path), served from cache_dir when the workbook is unchanged."""
+    cached = cache_path_for(cache_dir, file_path)
+
+    if os.path.exists(cached):
+        try:
+            return pd.read_pickle(cached)
+        except Exception:
+            os.remove(cached)
+
+    df = pd.read_excel(file_path)
+
+    # Drop entries for older versions of this workbook, then store the new one
+    for stale in glob.glob(os.path.join(cache_dir, f"{_path_key(file_path)}_*.pkl")):
+        os.remove(stale)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cached + ".tmp"
+    df.to_pickle(tmp_path)
+    os.replace(tmp_path, cached)
+    return df
+
+
+def evict_deleted(cache_dir, live_paths):
+    """Removes cache entries whose workbook is no longer among live_paths."""
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    live_keys = {_path_key(p) for p in live_paths}
+    removed = 0
+    for entry in os.listdir(cache_dir):
+        if entry.endswith(".pkl") and entry.split("_", 1)[0] not in live_keys:
+            os.remove(os.path.join(cache_dir, entry))
+            removed += 1
+    return removed